@@ -0,0 +1,45 @@
+"""
+Compares evaluation backends on the same parsed expressions.
+
+Run from the repository root with `python -m bench.backends`.
+"""
+import timeit
+from src.bytecode import BytecodeCompiler
+from src.closure_compiler import ClosureCompiler
+from src.evaluator import Evaluator
+from src.parser import Parser
+from src.scanner import Scanner
+from src.vm import VM
+
+
+SCRIPTS = {
+    "mixed": "not ((1 + 2 * 3 - 4 // 2) ** 2 == (10 - 3) * 7) is (2.5 * 4 > 9 + 0.5)\n",
+    "arithmetic": " + ".join(f"({i} * {i + 1} - {i} // 3) ** 2 / {i + 1}" for i in range(1, 40)) + "\n",
+    "nested": "(" * 60 + "1" + " + 2) * 1" * 60 + "\n",
+}
+REPEAT = 2000
+
+
+def main():
+    for script, source in SCRIPTS.items():
+        expr = Parser(Scanner(source).scan()).parse()
+        evaluator = Evaluator()
+        compiled = ClosureCompiler.compile(expr)
+        chunk = BytecodeCompiler.compile(expr)
+        backends = {
+            "tree": lambda: evaluator.evaluate(expr),
+            "closure": compiled,
+            "vm": lambda: VM.run(chunk),
+        }
+        results = { name: run() for name, run in backends.items() }
+        assert len(set(results.values())) == 1, results
+        print(f"{script}:")
+        baseline = None
+        for name, run in backends.items():
+            seconds = min(timeit.repeat(run, number=REPEAT, repeat=5))
+            baseline = baseline or seconds
+            print(f"  {name:>8}: {REPEAT / seconds:>12,.0f} evals/s  ({baseline / seconds:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Compares the memory held by an object tree and by a `FlatAst` of the same
+generated expression, and the time to evaluate each.
+
+Run from the repository root with `python -m bench.flat_ast`.
+"""
+import gc
+import sys
+import timeit
+import tracemalloc
+from bench.parser import generate
+from src.evaluator import Evaluator
+from src.flat_ast import FlatAst, FlatEvaluator
+from src.parser import Parser
+from src.scanner import Scanner
+
+
+def traced_size(build):
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+
+def balanced(depth: int, seed: int = 0) -> str:
+    """
+    Builds a numeric expression that is a complete binary tree of the given
+    depth, so the recursive evaluator stays within the recursion limit.
+    """
+    leaves = [str(seed % 9 + index % 9 + 1) for index in range(2 ** depth)]
+    operators = ["+", "-"]
+    while len(leaves) > 1:
+        leaves = [
+            f"({leaves[index]} {operators[index // 2 % 2]} {leaves[index + 1]})"
+            for index in range(0, len(leaves), 2)
+        ]
+    return leaves[0] + "\n"
+
+
+def main():
+    terms = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    buffer = Scanner(generate(terms)).scan_buffer()
+    tree, tree_size = traced_size(lambda: Parser(buffer, "pratt").parse())
+    flat, flat_size = traced_size(lambda: FlatAst.from_tree(tree))
+    print(f"{len(flat):,} nodes")
+    print(f"  tree: {tree_size / 1e6:>8.2f} MB")
+    print(f"  flat: {flat_size / 1e6:>8.2f} MB  ({tree_size / flat_size:.1f}x smaller)")
+    tree = Parser(Scanner(balanced(16)).scan_buffer()).parse()
+    flat = FlatAst.from_tree(tree)
+    assert Evaluator().evaluate(tree) == FlatEvaluator.evaluate(flat)
+    print(f"evaluating {len(flat):,} nodes")
+    for name, run in (("tree", lambda: Evaluator().evaluate(tree)), ("flat", lambda: FlatEvaluator.evaluate(flat))):
+        seconds = min(timeit.repeat(run, number=1, repeat=3))
+        print(f"  {name}: {seconds * 1e3:>8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
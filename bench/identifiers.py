@@ -0,0 +1,52 @@
+"""
+Measures scanning and parsing of identifier-heavy input, and how many
+distinct string objects its identifiers end up as.
+
+Run from the repository root with `python -m bench.identifiers [SIZE]`.
+"""
+import random
+import sys
+import timeit
+from src.parser import Parser
+from src.scanner import Scanner
+from src.symbols import SymbolTable
+from src.token import TokenType
+
+
+NAMES = 64
+OPERATORS = ("+", "-", "*", "==", "<", "is")
+
+
+def generate(size: int, names: int = NAMES, seed: int = 0) -> str:
+    """
+    Returns a script of `size` variables from a pool of `names` joined by
+    operators, with the occasional `not` keyword in front of one.
+    """
+    rng = random.Random(seed)
+    pool = [f"name_{index}" for index in range(names)]
+    parts = [rng.choice(pool)]
+    for _ in range(size - 1):
+        parts.append(rng.choice(OPERATORS))
+        parts.append(("not " if rng.random() < 0.1 else "") + rng.choice(pool))
+    return " ".join(parts) + "\n"
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    source = generate(size)
+    print(f"{size:,} identifiers, {len(source):,} characters")
+    for engine in ("default", "fast"):
+        seconds = min(timeit.repeat(lambda: Scanner(source, engine).scan(), number=1, repeat=3))
+        print(f"  scan {engine:>8}: {seconds:.3f}s  ({size / seconds:,.0f} identifiers/s)")
+    for engine in ("recursive", "pratt"):
+        tokens = Scanner(source).scan_buffer()
+        seconds = min(timeit.repeat(lambda: Parser(tokens, engine).parse(), number=1, repeat=3))
+        print(f"  parse {engine:>7}: {seconds:.3f}s  ({size / seconds:,.0f} identifiers/s)")
+    symbols = SymbolTable()
+    tokens = Scanner(source, symbols=symbols).scan()
+    lexemes = [token.lexeme for token in tokens if token.type is TokenType.IDENT]
+    print(f"  {len(symbols)} symbols, {len(set(map(id, lexemes)))} distinct lexeme objects")
+
+
+if __name__ == "__main__":
+    main()
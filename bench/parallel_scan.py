@@ -0,0 +1,37 @@
+"""
+Compares serial and parallel scanning of a large generated script.
+
+Run from the repository root with
+`python -m bench.parallel_scan [SIZE [MIN_CHUNK_SIZE]]`. Worker counts that
+would leave chunks below `MIN_CHUNK_SIZE` characters (1 MiB by default) are
+scanned serially by `scan_parallel`, so they are reported as such instead of
+being timed.
+"""
+import os
+import sys
+import timeit
+from src.scanner import Scanner
+from .workload import generate
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 500000
+    min_chunk_size = int(sys.argv[2]) if len(sys.argv) > 2 else 1 << 20
+    source = generate(size)
+    print(f"{len(source):,} characters, {os.cpu_count()} CPUs, chunks of at least {min_chunk_size:,}")
+    serial = min(timeit.repeat(lambda: Scanner(source).scan_buffer(), number=1, repeat=3))
+    print(f"  serial: {serial:.3f}s")
+    workers = 2
+    while workers <= (os.cpu_count() or 1) * 2:
+        parts = min(workers, len(source) // min_chunk_size)
+        if parts <= 1:
+            print(f"  {workers:>6}: serial, source is below two chunks")
+        else:
+            run = lambda: Scanner(source).scan_parallel(workers, min_chunk_size)
+            seconds = min(timeit.repeat(run, number=1, repeat=3))
+            print(f"  {workers:>6}: {seconds:.3f}s  ({serial / seconds:.2f}x, {parts} chunks)")
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Measures parse throughput on a large generated expression.
+
+Run from the repository root with `python -m bench.parser`.
+"""
+import random
+import sys
+import timeit
+from src.parser import Parser
+from src.scanner import Scanner
+
+
+OPERATORS = ["+", "-", "*", "/", "**", "//", "==", "is", "<", ">=", "<="]
+LITERALS = ["1", "42", "3.5", "'text'", "true", "false", "nil"]
+
+
+def generate(terms: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    parts = [rng.choice(LITERALS)]
+    for index in range(terms):
+        operand = rng.choice(LITERALS)
+        if rng.random() < 0.2:
+            operand = f"-{operand}"
+        if rng.random() < 0.2:
+            operand = f"({operand} {rng.choice(OPERATORS)} {rng.choice(LITERALS)})"
+        parts.append(rng.choice(OPERATORS))
+        parts.append(operand)
+        if index % 16 == 15:
+            parts.append("\n")
+    return " ".join(parts) + "\n"
+
+
+def main():
+    terms = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    source = generate(terms)
+    tokens = Scanner(source).scan()
+    buffer = Scanner(source).scan_buffer()
+    print(f"{len(tokens):,} tokens")
+    # The recursive engine's call depth grows with operand nesting only, so
+    # the generated expression stays well within the recursion limit.
+    for engine in ("recursive", "pratt"):
+        for name, source_tokens in (("list", tokens), ("buffer", buffer)):
+            seconds = min(timeit.repeat(lambda: Parser(source_tokens, engine).parse(), number=1, repeat=3))
+            print(f"{engine:>9} {name:>6}: {len(tokens) / seconds:>12,.0f} tokens/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Times each interpreter phase on generated workloads and compares the
+throughput against a stored baseline.
+
+Run from the repository root with `python -m bench.suite`. The command exits
+with status 1 when any phase is slower than the baseline by more than the
+threshold. Record a new baseline with `--update-baseline`; baselines are
+machine-specific, so record one before comparing on a new machine.
+"""
+import argparse
+import io
+import json
+import sys
+import timeit
+from pathlib import Path
+from typing import Any, Callable
+from src.ast import AstParser
+from src.evaluator import Evaluator
+from src.parser import Parser
+from src.profiler import count_nodes
+from src.scanner import Scanner
+from src.symbols import SymbolTable
+from .workload import generate
+
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+DEFAULT_THRESHOLD = 0.25
+WORKLOADS: dict[str, dict[str, Any]] = {
+    "small": { "size": 256, "depth": 3, "mix": "mixed" },
+    "large": { "size": 32768, "depth": 3, "mix": "mixed" },
+    "deep": { "size": 2048, "depth": 10, "mix": "arithmetic" },
+    "comparison": { "size": 8192, "depth": 2, "mix": "comparison" },
+}
+
+
+def best_time(run: Callable[[], Any], repeat: int) -> float:
+    # Small workloads are looped until a run is long enough to time reliably.
+    timer = timeit.Timer(run)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat, number)) / number
+
+
+def measure(source: str, repeat: int) -> dict[str, float]:
+    """
+    Returns the throughput of each phase on `source`: tokens per second for
+    scanning and parsing, nodes per second for printing and evaluation.
+    "scan" and "parse" make the same calls as `Interpreter.parse`; the
+    recursive parser, still selectable with `--parser`, is timed apart.
+    """
+    tokens = Scanner(source).scan_buffer()
+    expr = Parser(tokens, "pratt").parse()
+    nodes = count_nodes(expr)
+    evaluator = Evaluator()
+    phases = {
+        "scan": (lambda: Scanner(source, diagnostics=[], symbols=SymbolTable()).scan_buffer(), len(tokens)),
+        "parse": (lambda: Parser(tokens, "pratt", diagnostics=[], symbols=SymbolTable()).parse(), len(tokens)),
+        "parse_recursive": (lambda: Parser(tokens, "recursive", diagnostics=[], symbols=SymbolTable()).parse(), len(tokens)),
+        "print": (lambda: AstParser.print(expr, io.StringIO()), nodes),
+        "evaluate": (lambda: evaluator.evaluate(expr), nodes),
+    }
+    return { phase: items / best_time(run, repeat) for phase, (run, items) in phases.items() }
+
+
+def compare(results: dict[str, dict[str, float]], baseline: dict[str, dict[str, float]], threshold: float) -> list[str]:
+    regressions = []
+    for workload, phases in results.items():
+        for phase, throughput in phases.items():
+            expected = baseline.get(workload, {}).get(phase)
+            if expected is not None and throughput < expected * (1 - threshold):
+                regressions.append(f"{workload}/{phase}: {throughput:,.0f}/s < baseline {expected:,.0f}/s")
+    return regressions
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(prog="python -m bench.suite")
+    arg_parser.add_argument("workloads", nargs="*", help=f"workloads to run: {', '.join(WORKLOADS)} (default: all)")
+    arg_parser.add_argument("--repeat", type=int, default=5, help="runs per phase; the fastest one counts")
+    arg_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="allowed fractional throughput drop")
+    arg_parser.add_argument("--baseline", type=Path, default=BASELINE_PATH, help="baseline JSON file")
+    arg_parser.add_argument("--update-baseline", action="store_true", help="store these results as the new baseline")
+    args = arg_parser.parse_args()
+    for workload in args.workloads:
+        if workload not in WORKLOADS:
+            arg_parser.error(f"unknown workload: {workload}")
+
+    baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+    results = {}
+    for workload in args.workloads or WORKLOADS:
+        source = generate(**WORKLOADS[workload])
+        results[workload] = measure(source, args.repeat)
+        print(f"{workload}:")
+        for phase, throughput in results[workload].items():
+            expected = baseline.get(workload, {}).get(phase)
+            change = f"  ({throughput / expected - 1:+.1%})" if expected else ""
+            print(f"  {phase:>15}: {throughput:>12,.0f}/s{change}")
+
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps({ **baseline, **results }, indent=2) + "\n")
+        print(f"Baseline written to {args.baseline}")
+        return
+    regressions = compare(results, baseline, args.threshold)
+    for regression in regressions:
+        print(f"REGRESSION {regression}", file=sys.stderr)
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
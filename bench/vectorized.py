@@ -0,0 +1,46 @@
+"""
+Compares evaluating a formula one row at a time with `Evaluator` against
+one vectorized pass with `VectorEvaluator`. Requires NumPy.
+
+Run from the repository root with `python -m bench.vectorized [ROWS]`.
+"""
+import sys
+import timeit
+from src.evaluator import Evaluator
+from src.interpreter import Interpreter
+from src.vectorized import np, VectorEvaluator
+
+
+FORMULA = "(price * quantity - discount) // 3 >= price ** 2 / quantity\n"
+
+
+def main():
+    if np is None:
+        print("NumPy is not installed.")
+        return
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    rng = np.random.default_rng(0)
+    columns = {
+        "price": rng.uniform(1, 100, rows),
+        "quantity": rng.integers(1, 50, rows),
+        "discount": rng.integers(0, 10, rows),
+    }
+    expr = Interpreter.parse(FORMULA)
+    print(f"{rows:,} rows: {FORMULA.strip()}")
+    table = { name: column.tolist() for name, column in columns.items() }
+
+    def per_row():
+        env: dict = {}
+        evaluator = Evaluator(env)
+        for values in zip(*table.values()):
+            env.update(zip(table, values))
+            evaluator.evaluate(expr)
+
+    scalar = min(timeit.repeat(per_row, number=1, repeat=3))
+    vector = min(timeit.repeat(lambda: VectorEvaluator.evaluate(expr, columns), number=1, repeat=3))
+    print(f"  per row: {scalar:.3f}s  ({rows / scalar:,.0f} rows/s)")
+    print(f"  vectorized: {vector:.3f}s  ({rows / vector:,.0f} rows/s, {scalar / vector:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
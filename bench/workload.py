@@ -0,0 +1,139 @@
+"""
+Generates large random expression programs that always scan, parse and
+evaluate without errors.
+
+Run from the repository root with `python -m bench.workload [SIZE] [DEPTH] [MIX]`
+to print one.
+"""
+import random
+import sys
+
+
+ARITHMETIC = ("+", "-", "*", "/", "//", "**")
+COMPARISON = ("<", ">", "<=", ">=")
+EQUALITY = ("==", "is")
+MIXES: dict[str, dict[str, int]] = {
+    "arithmetic": { "+": 4, "-": 3, "*": 3, "/": 1, "//": 1, "**": 1 },
+    "comparison": { "+": 2, "-": 2, "*": 1, "<": 2, ">": 2, "<=": 1, ">=": 1, "==": 1 },
+    "mixed": { "+": 3, "-": 2, "*": 2, "/": 1, "//": 1, "**": 1, "<": 1, ">": 1, "<=": 1, ">=": 1, "==": 1, "is": 1 },
+}
+OTHER_LITERALS = ("'text'", "'lox'", "true", "false", "nil")
+CLAUSE_TERMS = 16
+
+
+def generate(size: int, depth: int = 3, mix: str | dict[str, int] = "mixed", seed: int = 0) -> str:
+    """
+    Returns a program of about `size` terms whose groups nest at most `depth`
+    levels inside each clause. `mix` names one of `MIXES` or maps operators
+    to relative weights.
+
+    Clauses of `CLAUSE_TERMS` terms are joined pairwise into a balanced tree
+    so that evaluation depth grows with log(size) rather than size.
+    """
+    weights = MIXES[mix] if isinstance(mix, str) else mix
+    return _Generator(random.Random(seed), depth, weights).program(size) + "\n"
+
+
+class _Generator:
+    def __init__(self, rng: random.Random, depth: int, weights: dict[str, int]) -> None:
+        self.rng = rng
+        self.depth = depth
+        self.operators = list(weights)
+        self.weights = list(weights.values())
+        self.arithmetic = [operator for operator in self.operators if operator in ARITHMETIC] or ["+"]
+        self.arithmetic_weights = [weights.get(operator, 1) for operator in self.arithmetic]
+        self.equality = [operator for operator in self.operators if operator in EQUALITY]
+        # Clauses are only numeric when the mix has no operator producing a
+        # boolean, in which case they must be joined arithmetically.
+        self.numeric = not any(operator in COMPARISON or operator in EQUALITY for operator in self.operators)
+        self.terms = 0
+
+
+    def program(self, size: int) -> str:
+        if size <= CLAUSE_TERMS:
+            return self.leaf(size)
+        half = size // 2
+        left = self.program(half)
+        right = self.program(size - half)
+        if self.numeric:
+            operator = self.rng.choice(("+", "-"))
+        else:
+            operator = self.rng.choice(self.equality or ["=="])
+        return f"({left})\n{operator} ({right})"
+
+
+    def leaf(self, terms: int) -> str:
+        if not self.numeric:
+            chance = self.rng.random()
+            if chance < 0.05:
+                return self.rng.choice(OTHER_LITERALS)
+            if chance < 0.15:
+                return f"not ({self.clause(terms)})"
+        return self.clause(terms)
+
+
+    def clause(self, terms: int) -> str:
+        parts = [self.number(self.depth)]
+        compared = False
+        for _ in range(terms - 1):
+            operator = self.rng.choices(self.operators, self.weights)[0]
+            if operator in COMPARISON and compared:
+                operator = self.rng.choice(self.equality or ["=="])
+            if operator in COMPARISON:
+                compared = True
+            elif operator in EQUALITY:
+                compared = False
+            parts.extend(self.operation(operator, self.depth))
+        return " ".join(parts)
+
+
+    def chain(self, depth: int, terms: int) -> str:
+        parts = [self.number(depth)]
+        for _ in range(terms - 1):
+            operator = self.rng.choices(self.arithmetic, self.arithmetic_weights)[0]
+            parts.extend(self.operation(operator, depth))
+        return " ".join(parts)
+
+
+    def operation(self, operator: str, depth: int) -> tuple[str, str]:
+        match operator:
+            case "/" | "//":
+                return operator, self.positive(depth)
+            case "**":
+                # `**` shares precedence with `*`, so a bare power would raise
+                # the whole product so far. Grouped small powers stay finite.
+                return "*", f"({self.literal()} ** {self.rng.randint(0, 3)})"
+            case _:
+                return operator, self.number(depth)
+
+
+    def number(self, depth: int) -> str:
+        chance = self.rng.random()
+        if depth > 0 and chance < 0.2:
+            return f"({self.chain(depth - 1, self.rng.randint(2, 4))})"
+        if chance < 0.3:
+            return f"-{self.literal()}"
+        return self.literal()
+
+
+    def positive(self, depth: int) -> str:
+        if depth > 0 and self.rng.random() < 0.2:
+            return f"({self.positive(depth - 1)} {self.rng.choice(('+', '*'))} {self.positive(depth - 1)})"
+        return self.literal()
+
+
+    def literal(self) -> str:
+        if self.rng.random() < 0.25:
+            return f"{self.rng.randint(1, 9)}.{self.rng.randint(1, 9)}"
+        return str(self.rng.randint(1, 99))
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+    depth = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    mix = sys.argv[3] if len(sys.argv) > 3 else "mixed"
+    sys.stdout.write(generate(size, depth, mix))
+
+
+if __name__ == "__main__":
+    main()
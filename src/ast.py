@@ -1,110 +1,136 @@
-from typing import Any, List
-from .grammar import BinaryExpr, Expr, ExprElem, LiteralExpr, UnaryExpr, GroupExpr
+import sys
+from typing import Any, List, TextIO
+from .grammar import BinaryExpr, Expr, ExprElem, LiteralExpr, UnaryExpr, GroupExpr, VariableExpr
 from .token import TokenType
 
+
+OPERATOR_SYMBOLS = {
+    TokenType.EQUAL_EQUAL: "==",
+    TokenType.BANG_EQUAL: "!=",
+    TokenType.GT: ">",
+    TokenType.LT: "<",
+    TokenType.GT_EQUAL: ">=",
+    TokenType.LT_EQUAL: "<=",
+    TokenType.PLUS: "+",
+    TokenType.MINUS: "-",
+    TokenType.STAR: "*",
+    TokenType.STAR_STAR: "**",
+    TokenType.SLASH: "/",
+    TokenType.SLASH_SLASH: "//",
+}
+
+
+UNARY_SYMBOLS = {
+    TokenType.NOT: "not",
+    TokenType.MINUS: "-",
+}
+
+
+# Lines are handed to the stream in batches of this many.
+WRITE_BATCH_SIZE = 4096
+
+
 class AstParser:
     @staticmethod
-    def print(expr: ExprElem):
-        _AstPrinter(expr).print()
+    def print(expr: ExprElem, stream: TextIO | None = None):
+        _AstPrinter(expr, stream if stream is not None else sys.stdout).print()
 
 
 class _AstPrinter(Expr):
-    def __init__(self, expr: ExprElem) -> None:
+    """
+    Writes the tree rendering of `expr` to `stream` while walking it. The walk
+    uses an explicit stack of pending actions instead of recursion, so trees
+    of any depth can be printed.
+    """
+    def __init__(self, expr: ExprElem, stream: TextIO) -> None:
         self.expr = expr
+        self.stream = stream
         self.indent_level = 0
-        self.print_expr_list: List[tuple[str, int, Any]] = []
+        self.actions: List[tuple] = []
+        self.pending_item: tuple[str, int, Any] | None = None
+        self.lines: List[str] = []
 
 
     def print(self):
-        self.visit_expressions(self.expr)
-        print(self.get_print_str())
-
-
-    def get_print_str(self):
-        print_str = ""
-        total_list = len(self.print_expr_list) - 1
-        for index, item in enumerate(self.print_expr_list):
-            token, indent_level, value = item
-            if indent_level > 1:
-                start_prefix = "┣" if index < total_list else "┗"
-                print_str += start_prefix
-                print_str += "━" * (indent_level - 1)
-            print_str += token
-            if value is not None:
-                print_str += f" {value}"
-            if index < total_list:
-                print_str += "\n"
-        return print_str
+        self.actions.append(('visit', self.expr))
+        while self.actions:
+            action = self.actions.pop()
+            match action[0]:
+                case 'visit':
+                    self.visit_expressions(action[1])
+                case 'item':
+                    self.add_print_expr_item(action[1], action[2])
+                case 'dedent':
+                    self.indent_level -= 1
+        if self.pending_item is not None:
+            self.lines.append(self.format_item(*self.pending_item, is_last=True))
+        self.lines.append("\n")
+        self.flush()
+
+
+    def format_item(self, token: str, indent_level: int, value: Any, is_last: bool) -> str:
+        line = ""
+        if indent_level > 1:
+            line += "┗" if is_last else "┣"
+            line += "━" * (indent_level - 1)
+        line += token
+        if value is not None:
+            line += f" {value}"
+        return line
 
 
     def add_print_expr_item(self, expr: str, value: Any = None):
-        self.print_expr_list.append((expr, self.indent_level, value))
+        # An item is only known not to be the last one once the next arrives,
+        # so each is held back by one.
+        if self.pending_item is not None:
+            self.lines.append(self.format_item(*self.pending_item, is_last=False))
+            self.lines.append("\n")
+            if len(self.lines) >= WRITE_BATCH_SIZE:
+                self.flush()
+        self.pending_item = (expr, self.indent_level, value)
+
+
+    def flush(self):
+        self.stream.writelines(self.lines)
+        self.lines.clear()
 
 
     def visit_expressions(self, expr):
         self.indent_level += 1
         match expr:
             case _bin if isinstance(expr, BinaryExpr):
+                self.actions.append(('dedent',))
                 self.visit_binary(_bin)
-                self.indent_level -= 1
             case _group if isinstance(expr, GroupExpr):
+                self.actions.append(('dedent',))
                 self.visit_group(_group)
-                self.indent_level -= 1
             case _unary if isinstance(expr, UnaryExpr):
+                self.actions.append(('dedent',))
                 self.visit_unary(_unary)
-                self.indent_level -= 1
             case _literal if isinstance(expr, LiteralExpr):
                 self.visit_literal(_literal)
+            case _variable if isinstance(expr, VariableExpr):
+                self.visit_variable(_variable)
 
 
+    # The visit methods below schedule their children on the action stack in
+    # reverse order, so they run in the order a recursive walk would.
     def visit_binary(self, expr):
         self.add_print_expr_item('BINARY')
-        self.visit_expressions(expr.left)
-        operator = ""
-        match expr.operator:
-            case TokenType.EQUAL_EQUAL:
-                operator += "=="
-            case TokenType.BANG_EQUAL:
-                operator += "!="
-            case TokenType.GT:
-                operator += ">"
-            case TokenType.LT:
-                operator += "<"
-            case TokenType.GT_EQUAL:
-                operator += ">="
-            case TokenType.LT_EQUAL:
-                operator += "<="
-            case TokenType.PLUS:
-                operator += "+"
-            case TokenType.MINUS:
-                operator += "-"
-            case TokenType.STAR:
-                operator += "*"
-            case TokenType.STAR_STAR:
-                operator += "**"
-            case TokenType.SLASH:
-                operator += "/"
-            case TokenType.SLASH_SLASH:
-                operator += "//"
-        self.add_print_expr_item('OPERATOR', operator)
-        self.indent_level -= 1
-        self.visit_expressions(expr.right)
+        self.actions.append(('visit', expr.right))
+        self.actions.append(('dedent',))
+        self.actions.append(('item', 'OPERATOR', OPERATOR_SYMBOLS.get(expr.operator, "")))
+        self.actions.append(('visit', expr.left))
 
 
     def visit_group(self, expr):
         self.add_print_expr_item('GROUP')
-        self.visit_expressions(expr.group)
+        self.actions.append(('visit', expr.group))
 
 
     def visit_unary(self, expr):
-        symbol = ""
-        match expr.symbol:
-            case TokenType.NOT:
-                symbol += "not"
-            case TokenType.MINUS:
-                symbol += "-"
-        self.add_print_expr_item('UNARY', symbol)
-        self.visit_expressions(expr.unary)
+        self.add_print_expr_item('UNARY', UNARY_SYMBOLS.get(expr.symbol, ""))
+        self.actions.append(('visit', expr.unary))
 
 
     def visit_literal(self, expr):
@@ -116,5 +142,9 @@ class _AstPrinter(Expr):
         self.add_print_expr_item('LITERAL', literal)
 
 
+    def visit_variable(self, expr):
+        self.add_print_expr_item('VARIABLE', expr.name)
+
+
     def visit_not_implemented_expr(self, expr):
         print("Not implemented")
@@ -0,0 +1,108 @@
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Iterator, TextIO
+from typing_extensions import NotRequired, TypedDict
+from .evaluator import Evaluator
+from .interpreter import Interpreter
+from .profiler import PhaseProfiler
+
+
+class BatchResult(TypedDict):
+    file: str
+    status: str
+    result: NotRequired[str]
+    error: NotRequired[str]
+    output: NotRequired[str]
+    timings: dict[str, float]
+
+
+class BatchRunner:
+    """
+    Runs every `.lox` script under a directory across a pool of worker
+    processes and writes one JSON object per script to `report`. Each
+    script goes through `Interpreter` with the same options a single run
+    takes, so it gives the result `main` would.
+    """
+    def __init__(
+        self,
+        directory: str,
+        workers: int | None = None,
+        backend: str = "tree",
+        parser: str = "pratt",
+        optimize: bool = False,
+        intern: bool = False
+    ) -> None:
+        self.directory = directory
+        self.workers = workers or os.cpu_count() or 1
+        self.backend = backend
+        self.parser = parser
+        self.optimize = optimize
+        self.intern = intern
+
+
+    def discover(self) -> list[str]:
+        scripts = []
+        for root, _, files in os.walk(self.directory):
+            scripts.extend(os.path.join(root, name) for name in files if name.endswith(".lox"))
+        return sorted(scripts)
+
+
+    def run(self, report: TextIO = sys.stdout) -> bool:
+        """
+        Runs all scripts and returns whether every one of them succeeded.
+        Results are written in discovery order as they become available.
+        """
+        scripts = self.discover()
+        start = time.perf_counter()
+        failures = 0
+        for result in self.iter_results(scripts):
+            failures += result["status"] != "ok"
+            report.write(json.dumps(result) + "\n")
+        elapsed = time.perf_counter() - start
+        print(f"{len(scripts)} scripts, {failures} failed, {elapsed:.2f}s", file=sys.stderr)
+        return failures == 0
+
+
+    def iter_results(self, scripts: list[str]) -> Iterator[BatchResult]:
+        if not scripts:
+            return
+        # Hand scripts out in chunks so small files are not dominated by
+        # inter-process round trips.
+        chunksize = max(1, len(scripts) // (self.workers * 4))
+        options = (self.backend, self.parser, self.optimize, self.intern)
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            yield from executor.map(run_batch_script, scripts, *([option] * len(scripts) for option in options), chunksize=chunksize)
+
+
+def run_batch_script(
+    path: str,
+    backend: str = "tree",
+    parser: str = "pratt",
+    optimize: bool = False,
+    intern: bool = False
+) -> BatchResult:
+    timings: dict[str, float] = {}
+    result: BatchResult = { "file": path, "status": "ok", "timings": timings }
+    output = io.StringIO()
+    # Only phase times are reported, so allocations are not traced.
+    profiler = PhaseProfiler(trace_allocations=False)
+    start = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(output):
+            expr = Interpreter.parse_file(path, intern, profiler, parser=parser)
+            value: Any = Interpreter.run_expr(expr, False, backend, optimize, intern, profiler)
+        result["result"] = Evaluator.stringify(value)
+    except Exception as error:
+        result["status"] = "error"
+        result["error"] = f"{type(error).__name__}: {error}"
+    for record in profiler.phases:
+        timings[record["phase"]] = record["seconds"]
+    timings["total"] = time.perf_counter() - start
+    if output.getvalue():
+        result["output"] = output.getvalue()
+    return result
@@ -0,0 +1,154 @@
+from array import array
+from enum import IntEnum
+from typing import Any
+from .grammar import BinaryExpr, ExprElem, GroupExpr, LiteralExpr, UnaryExpr, VariableExpr
+from .token import TokenType
+
+
+class OpCode(IntEnum):
+    CONSTANT = 0
+    CONSTANT_LONG = 1
+    NIL = 2
+    TRUE = 3
+    FALSE = 4
+    ADD = 5
+    SUBTRACT = 6
+    MULTIPLY = 7
+    DIVIDE = 8
+    POWER = 9
+    FLOOR_DIVIDE = 10
+    GREATER = 11
+    LESS = 12
+    GREATER_EQUAL = 13
+    LESS_EQUAL = 14
+    EQUAL = 15
+    NOT_EQUAL = 16
+    IS = 17
+    NEGATE = 18
+    NOT = 19
+    UNSUPPORTED = 20
+    RETURN = 21
+    GET_VARIABLE = 22
+    GET_VARIABLE_LONG = 23
+
+
+BINARY_OPCODES = {
+    TokenType.PLUS: OpCode.ADD,
+    TokenType.MINUS: OpCode.SUBTRACT,
+    TokenType.STAR: OpCode.MULTIPLY,
+    TokenType.SLASH: OpCode.DIVIDE,
+    TokenType.STAR_STAR: OpCode.POWER,
+    TokenType.SLASH_SLASH: OpCode.FLOOR_DIVIDE,
+    TokenType.GT: OpCode.GREATER,
+    TokenType.LT: OpCode.LESS,
+    TokenType.GT_EQUAL: OpCode.GREATER_EQUAL,
+    TokenType.LT_EQUAL: OpCode.LESS_EQUAL,
+    TokenType.EQUAL_EQUAL: OpCode.EQUAL,
+    TokenType.BANG_EQUAL: OpCode.NOT_EQUAL,
+    TokenType.IS: OpCode.IS,
+}
+
+
+UNARY_OPCODES = {
+    TokenType.MINUS: OpCode.NEGATE,
+    TokenType.NOT: OpCode.NOT,
+}
+
+
+class Chunk:
+    """
+    Compiled bytecode: one opcode byte per instruction, followed by its
+    operand bytes, plus the pool of constants the operands index into.
+    """
+    def __init__(self) -> None:
+        self.code = array('B')
+        self.constants: list[Any] = []
+        self.constant_ids: dict[tuple[type, Any], int] = {}
+        # The decoded form the VM runs, built on its first run.
+        self.instructions: list[tuple[int, Any]] | None = None
+
+
+    def write(self, *data: int):
+        self.code.extend(data)
+
+
+    def add_constant(self, value: Any) -> int:
+        key = (type(value), value)
+        if key not in self.constant_ids:
+            self.constant_ids[key] = len(self.constants)
+            self.constants.append(value)
+        return self.constant_ids[key]
+
+
+class BytecodeCompiler:
+    @staticmethod
+    def compile(expr: ExprElem) -> Chunk:
+        compiler = _BytecodeCompiler()
+        compiler.compile(expr)
+        compiler.chunk.write(OpCode.RETURN)
+        return compiler.chunk
+
+
+class _BytecodeCompiler:
+    def __init__(self) -> None:
+        self.chunk = Chunk()
+
+
+    def compile(self, expr: ExprElem):
+        """
+        Emits the code of `expr` in post-order without recursion, so trees
+        of any depth compile. Pairs on the stack are (node, children done);
+        an operator is written once its operands have been.
+        """
+        stack: list[tuple[ExprElem, bool]] = [(expr, False)]
+        while stack:
+            node, children_done = stack.pop()
+            match node:
+                case BinaryExpr() if children_done:
+                    self.chunk.write(BINARY_OPCODES[node.operator])
+                case BinaryExpr():
+                    stack.extend(((node, True), (node.right, False), (node.left, False)))
+                case UnaryExpr() if children_done:
+                    self.chunk.write(UNARY_OPCODES[node.symbol])
+                case UnaryExpr():
+                    stack.extend(((node, True), (node.unary, False)))
+                case GroupExpr():
+                    stack.append((node.group, False))
+                case LiteralExpr():
+                    self.write_literal(node)
+                case VariableExpr():
+                    self.write_variable(node)
+                case _:
+                    self.chunk.write(OpCode.UNSUPPORTED)
+
+
+    def write_literal(self, expr: LiteralExpr):
+        value = expr.value
+        match value:
+            case None:
+                self.chunk.write(OpCode.NIL)
+            case True:
+                self.chunk.write(OpCode.TRUE)
+            case False:
+                self.chunk.write(OpCode.FALSE)
+            case _:
+                self.write_constant(value)
+
+
+    def write_variable(self, expr: VariableExpr):
+        # The name shares the constant pool, so a variable and a string
+        # literal spelled alike use one entry.
+        index = self.chunk.add_constant(expr.name)
+        self.write_operand(OpCode.GET_VARIABLE, OpCode.GET_VARIABLE_LONG, index)
+
+
+    def write_constant(self, value: Any):
+        index = self.chunk.add_constant(value)
+        self.write_operand(OpCode.CONSTANT, OpCode.CONSTANT_LONG, index)
+
+
+    def write_operand(self, opcode: OpCode, long_opcode: OpCode, index: int):
+        if index < 256:
+            self.chunk.write(opcode, index)
+        else:
+            self.chunk.write(long_opcode, index >> 16 & 0xff, index >> 8 & 0xff, index & 0xff)
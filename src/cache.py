@@ -0,0 +1,99 @@
+import hashlib
+import os
+import pickle
+import tempfile
+from typing import Any
+from . import __version__
+from .grammar import ExprElem
+
+
+CACHE_DIR = "__ploxcache__"
+
+
+class ScriptCache:
+    """
+    On-disk cache of parsed scripts, kept in a `__ploxcache__` directory next
+    to each script much like `__pycache__`. Entries record the hash of the
+    source they were parsed from and the interpreter version that wrote them;
+    an entry matching neither is discarded on load. Once the directory holds
+    more than `max_entries` entries the least recently used are evicted.
+    """
+    def __init__(self, script_path: str, max_entries: int = 256) -> None:
+        self.script_path = script_path
+        self.directory = os.path.join(os.path.dirname(os.path.abspath(script_path)), CACHE_DIR)
+        self.entry_path = os.path.join(self.directory, f"{os.path.basename(script_path)}.pickle")
+        self.max_entries = max_entries
+        self.source_hash = self.hash_source()
+
+
+    def hash_source(self) -> str:
+        digest = hashlib.sha256()
+        with open(self.script_path, "rb") as f:
+            while chunk := f.read(1 << 20):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+
+    def load(self) -> ExprElem | None:
+        try:
+            with open(self.entry_path, "rb") as f:
+                entry: dict[str, Any] = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            self.discard()
+            return None
+        if entry.get("version") != __version__ or entry.get("source_hash") != self.source_hash:
+            self.discard()
+            return None
+        # Touch the entry so eviction sees it as recently used. This is only
+        # bookkeeping, so a read-only cache directory still serves hits.
+        try:
+            os.utime(self.entry_path)
+        except OSError:
+            pass
+        return entry["expr"]
+
+
+    def store(self, expr: ExprElem):
+        entry = { "version": __version__, "source_hash": self.source_hash, "expr": expr }
+        temp_path = None
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, self.entry_path)
+        except (OSError, RecursionError, pickle.PicklingError):
+            # Caching is best-effort: an unwritable directory or a tree too
+            # deep to pickle only costs a reparse next time. A partly written
+            # temporary file is removed so failures do not pile them up.
+            if temp_path is not None:
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
+            return
+        self.evict()
+
+
+    def discard(self):
+        try:
+            os.remove(self.entry_path)
+        except OSError:
+            pass
+
+
+    def evict(self):
+        try:
+            entries = [entry for entry in os.scandir(self.directory) if entry.name.endswith(".pickle")]
+        except OSError:
+            return
+        if len(entries) <= self.max_entries:
+            return
+        entries.sort(key=lambda entry: entry.stat().st_mtime)
+        for entry in entries[:len(entries) - self.max_entries]:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
@@ -0,0 +1,57 @@
+from typing import Any, Callable
+from .evaluator import BINARY_OPERATIONS, UNARY_OPERATIONS, LoxRuntimeError, lookup
+from .grammar import BinaryExpr, Expr, ExprElem, GroupExpr, LiteralExpr, NotImplementedExpr, UnaryExpr, VariableExpr
+
+
+CompiledExpr = Callable[[], Any]
+
+
+class ClosureCompiler:
+    @staticmethod
+    def compile(expr: ExprElem, env: dict[str, Any] | None = None) -> CompiledExpr:
+        """
+        Turns `expr` into nested Python closures that evaluate it. Operator
+        lookup and group unwrapping happen once here rather than on every
+        call. Variables are read from `env` when the closures run, so it may
+        be updated between calls.
+        """
+        return expr.accept(_ClosureCompiler(env if env is not None else {}))
+
+
+class _ClosureCompiler(Expr):
+    def __init__(self, env: dict[str, Any]) -> None:
+        self.env = env
+
+
+    def visit_binary(self, expr: BinaryExpr) -> CompiledExpr:
+        operation = BINARY_OPERATIONS[expr.operator]
+        left = expr.left.accept(self)
+        right = expr.right.accept(self)
+        return lambda: operation(left(), right())
+
+
+    def visit_unary(self, expr: UnaryExpr) -> CompiledExpr:
+        operation = UNARY_OPERATIONS[expr.symbol]
+        unary = expr.unary.accept(self)
+        return lambda: operation(unary())
+
+
+    def visit_group(self, expr: GroupExpr) -> CompiledExpr:
+        return expr.group.accept(self)
+
+
+    def visit_literal(self, expr: LiteralExpr) -> CompiledExpr:
+        value = expr.value
+        return lambda: value
+
+
+    def visit_variable(self, expr: VariableExpr) -> CompiledExpr:
+        env = self.env
+        name = expr.name
+        return lambda: lookup(env, name)
+
+
+    def visit_not_implemented_expr(self, expr: NotImplementedExpr) -> CompiledExpr:
+        def fail():
+            raise LoxRuntimeError("[RUNTIME ERROR] Expression is not supported.")
+        return fail
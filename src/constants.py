@@ -0,0 +1,56 @@
+from typing import Any, Callable
+from .token import TokenType
+
+
+LITERAL_CONVERSIONS: dict[TokenType, Callable[[str], Any]] = {
+    TokenType.INTEGER: int,
+    TokenType.FLOAT: float,
+    TokenType.STRING: lambda lexeme: lexeme[1:-1],
+}
+
+
+def convert_literal(lexeme: str, kind: TokenType) -> Any:
+    return LITERAL_CONVERSIONS[kind](lexeme)
+
+
+class ConstantPool:
+    """
+    Deduplicated pool of literal values. Each distinct lexeme is converted
+    once, and equal values of the same type are stored once however they are
+    spelled, so `1.5` and `1.50` share a float and `'a'` and `"a"` a string.
+    """
+    def __init__(self) -> None:
+        self.values: list[Any] = []
+        self.value_ids: dict[tuple[type, Any], int] = {}
+        # Keyed by the lexeme alone, which already tells the kinds apart:
+        # strings keep their quotes and only floats contain a '.'. Hashing a
+        # `TokenType` runs Python code, which made every literal parse slower.
+        self.lexeme_values: dict[str, Any] = {}
+
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+    def __getitem__(self, index: int) -> Any:
+        return self.values[index]
+
+
+    def add(self, value: Any) -> int:
+        key = (type(value), value)
+        if key not in self.value_ids:
+            self.value_ids[key] = len(self.values)
+            self.values.append(value)
+        return self.value_ids[key]
+
+
+    def convert(self, lexeme: str, kind: TokenType) -> Any:
+        """
+        Returns the pooled value of the `kind` literal spelled `lexeme`.
+        Raises `ValueError` if `lexeme` is not a valid literal of that kind.
+        """
+        try:
+            return self.lexeme_values[lexeme]
+        except KeyError:
+            value = self.lexeme_values[lexeme] = self.values[self.add(convert_literal(lexeme, kind))]
+            return value
@@ -0,0 +1,57 @@
+from typing import List
+from .token import Token
+
+
+class Diagnostic:
+    """
+    A scan or syntax error at the `row` and `col` span of the offending
+    source, measured the same way as `Token.row` and `Token.col`.
+    """
+    __slots__ = ('kind', 'message', 'row', 'col')
+
+    def __init__(self, kind: str, message: str, row: tuple[int, int], col: tuple[int, int]) -> None:
+        self.kind = kind
+        self.message = message
+        self.row = row
+        self.col = col
+
+
+    def __repr__(self) -> str:
+        return f"<Diagnostic(kind={self.kind}, message={self.message}, col={self.col}, row={self.row})>"
+
+
+    def __str__(self) -> str:
+        return f"[{self.kind}] Line: {self.row[0]} Col: {self.col} {self.message}"
+
+
+    @staticmethod
+    def at_token(kind: str, message: str, token: Token) -> 'Diagnostic':
+        return Diagnostic(kind, message, token.row, token.col)
+
+
+    @staticmethod
+    def after_token(kind: str, message: str, token: Token | None) -> 'Diagnostic':
+        """
+        Points just past `token`, or at the start of the source without one,
+        for errors found at the end of the input.
+        """
+        if token is None:
+            return Diagnostic(kind, message, (1, 1), (0, 0))
+        column = token.col[1] + 1
+        return Diagnostic(kind, message, (token.row[1], token.row[1]), (column, column))
+
+
+class LoxSyntaxError(Exception):
+    """
+    Raised once scanning and parsing have finished with every diagnostic
+    they collected, in source order.
+    """
+    def __init__(self, diagnostics: List[Diagnostic]) -> None:
+        self.diagnostics = sorted(diagnostics, key=lambda diagnostic: (diagnostic.row[0], diagnostic.col[0]))
+        super().__init__("\n".join(str(diagnostic) for diagnostic in self.diagnostics))
+
+
+    def __reduce__(self):
+        # Rebuilt from the diagnostics rather than the message, so the error
+        # can cross process boundaries.
+        return (LoxSyntaxError, (self.diagnostics,))
@@ -0,0 +1,282 @@
+import asyncio
+import math
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable
+from .diagnostics import Diagnostic, LoxSyntaxError
+from .evaluator import BINARY_OPERATIONS, LoxRuntimeError
+from .flat_ast import FlatAst, FlatEvaluator
+from .parser import Parser
+from .scanner import Scanner
+from .token import TOKEN_TYPE_IDS, TOKEN_TYPES, TokenType
+
+
+# Largest integer an operation may take or produce, in bits, and longest
+# string `+` may produce. Budgets are checked between nodes, so these bound
+# how long one node can run past them: at this size the slowest operation,
+# `//`, takes a few tens of milliseconds.
+MAX_INT_BITS = 1 << 18
+MAX_STRING_LENGTH = 1 << 24
+
+
+class BudgetExceeded(LoxRuntimeError):
+    pass
+
+
+class ParseCache:
+    """
+    Least recently used cache of `FlatAst` trees keyed by source text, safe
+    to share between threads. Sources with syntax errors, or too long for
+    the step budget they were requested with, are not cached.
+    """
+    def __init__(self, max_entries: int = 256) -> None:
+        self.max_entries = max_entries
+        self.entries: OrderedDict[str, FlatAst] = OrderedDict()
+        self.lock = threading.Lock()
+
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+    def get(self, source: str, max_steps: int | None = None) -> FlatAst:
+        with self.lock:
+            flat = self.entries.get(source)
+            if flat is not None:
+                self.entries.move_to_end(source)
+                return flat
+        # Parsing happens outside the lock, so one slow source does not hold
+        # up the others; two threads may both parse a new source.
+        flat = parse_source(source, max_steps)
+        with self.lock:
+            self.entries[source] = flat
+            if len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return flat
+
+
+class Engine:
+    """
+    Evaluates expressions for asyncio applications. Scanning, parsing and
+    evaluation run on `executor` ("thread", "process" or an `Executor` the
+    caller owns) so they never block the event loop, and parsed trees are
+    kept in an LRU cache of `cache_size` sources. A thread pool shares one
+    cache; with a process pool each worker keeps its own.
+
+    Every request is held to a budget: evaluation stops with `BudgetExceeded`
+    after `timeout` seconds or when the expression has more than `max_steps`
+    nodes, and integers and strings may not grow past `MAX_INT_BITS` and
+    `MAX_STRING_LENGTH`. Either limit can be None to disable it. Workers
+    check the deadline before every node, so a request stops within one
+    operation of running out of time. On a thread pool a request that is
+    cancelled also stops its worker; a process pool worker runs on until
+    the deadline.
+    """
+    def __init__(
+        self,
+        executor: Executor | str = "thread",
+        workers: int | None = None,
+        cache_size: int = 256,
+        timeout: float | None = 1.0,
+        max_steps: int | None = 1_000_000
+    ) -> None:
+        match executor:
+            case "thread":
+                self.executor: Executor = ThreadPoolExecutor(max_workers=workers)
+            case "process":
+                self.executor = ProcessPoolExecutor(max_workers=workers)
+            case Executor():
+                self.executor = executor
+            case _:
+                raise Exception(f"Unknown executor: {executor}")
+        self.owns_executor = not isinstance(executor, Executor)
+        self.uses_processes = isinstance(self.executor, ProcessPoolExecutor)
+        self.cache = ParseCache(cache_size)
+        self.timeout = timeout
+        self.max_steps = max_steps
+
+
+    async def __aenter__(self) -> 'Engine':
+        return self
+
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.close()
+
+
+    async def evaluate(
+        self,
+        source: str,
+        env: dict[str, Any] | None = None,
+        timeout: float | None = None,
+        max_steps: int | None = None
+    ) -> Any:
+        """
+        Evaluates `source` with variables bound from `env` and returns its
+        value. `timeout` and `max_steps` override the engine's budget for
+        this request. Raises `LoxSyntaxError`, `LoxRuntimeError` or, when
+        the budget runs out, `BudgetExceeded`.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        max_steps = self.max_steps if max_steps is None else max_steps
+        # The deadline starts now, so time spent waiting for a free worker
+        # counts against it.
+        deadline = None if timeout is None else time.monotonic() + timeout
+        loop = asyncio.get_running_loop()
+        abandoned = None
+        if self.uses_processes:
+            job = loop.run_in_executor(
+                self.executor, evaluate_in_process, source, env, deadline, max_steps, self.cache.max_entries
+            )
+        else:
+            abandoned = threading.Event()
+            job = loop.run_in_executor(
+                self.executor, evaluate_source, self.cache, source, env, deadline, max_steps, abandoned
+            )
+        try:
+            # The worker stops itself at the deadline; this also covers a
+            # worker busy parsing.
+            return await asyncio.wait_for(job, timeout)
+        except asyncio.TimeoutError:
+            raise BudgetExceeded("[RUNTIME ERROR] Time budget exceeded.")
+        finally:
+            # Tells a worker still running that nobody waits for its result.
+            if abandoned is not None:
+                abandoned.set()
+
+
+    def close(self):
+        if self.owns_executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def parse_source(source: str, max_steps: int | None = None) -> FlatAst:
+    """
+    Scans and parses `source` into a `FlatAst`. Every node is built from at
+    most two tokens, a group from its parentheses, so a source of more than
+    twice `max_steps` tokens is refused with `BudgetExceeded` before it is
+    parsed.
+    """
+    diagnostics: list[Diagnostic] = []
+    tokens = Scanner(source, diagnostics=diagnostics).scan_buffer()
+    if max_steps is not None and len(tokens) > 2 * max_steps:
+        raise BudgetExceeded("[RUNTIME ERROR] Step budget exceeded.")
+    # Requests may nest arbitrarily deep, which only the iterative parser
+    # and the flat tree handle without recursion.
+    expr = Parser(tokens, engine="pratt", diagnostics=diagnostics).parse()
+    if diagnostics:
+        raise LoxSyntaxError(diagnostics)
+    return FlatAst.from_tree(expr)
+
+
+# Each worker process of a process pool keeps its own parse cache.
+_process_cache: ParseCache | None = None
+
+
+def evaluate_in_process(
+    source: str,
+    env: dict[str, Any] | None,
+    deadline: float | None,
+    max_steps: int | None,
+    cache_size: int
+) -> Any:
+    # `time.monotonic()` is the same clock in every process of a machine,
+    # so the deadline set by the parent holds here.
+    global _process_cache
+    if _process_cache is None:
+        _process_cache = ParseCache(cache_size)
+    return evaluate_source(_process_cache, source, env, deadline, max_steps)
+
+
+def evaluate_source(
+    cache: ParseCache,
+    source: str,
+    env: dict[str, Any] | None,
+    deadline: float | None,
+    max_steps: int | None,
+    abandoned: threading.Event | None = None
+) -> Any:
+    # The request may have waited for a worker until it was given up on.
+    check_budget(deadline, abandoned)
+    flat = cache.get(source, max_steps)
+    return evaluate_flat(flat, env if env is not None else {}, deadline, max_steps, abandoned)
+
+
+def evaluate_flat(
+    flat: FlatAst,
+    env: dict[str, Any],
+    deadline: float | None,
+    max_steps: int | None,
+    abandoned: threading.Event | None = None
+) -> Any:
+    """
+    Evaluates `flat` with `FlatEvaluator.evaluate`, one step per node,
+    raising `BudgetExceeded` if it has more than `max_steps` nodes, once
+    `deadline` (a `time.monotonic()` value) has passed or `abandoned` is
+    set, or when an operation would take or make a value past the size
+    limits.
+    """
+    if max_steps is not None and len(flat) > max_steps:
+        raise BudgetExceeded("[RUNTIME ERROR] Step budget exceeded.")
+    check_budget(deadline, abandoned)
+    monotonic = time.monotonic
+    limit = math.inf if deadline is None else deadline
+    is_abandoned = abandoned.is_set if abandoned is not None else lambda: False
+
+    def before_node():
+        if monotonic() > limit or is_abandoned():
+            check_budget(deadline, abandoned)
+
+    return FlatEvaluator.evaluate(flat, env, before_node, SIZED_BINARY_OPERATIONS)
+
+
+def check_budget(deadline: float | None, abandoned: threading.Event | None):
+    if abandoned is not None and abandoned.is_set():
+        raise BudgetExceeded("[RUNTIME ERROR] Evaluation was abandoned.")
+    if deadline is not None and time.monotonic() > deadline:
+        raise BudgetExceeded("[RUNTIME ERROR] Time budget exceeded.")
+
+
+PLUS = TOKEN_TYPE_IDS[TokenType.PLUS]
+STAR = TOKEN_TYPE_IDS[TokenType.STAR]
+STAR_STAR = TOKEN_TYPE_IDS[TokenType.STAR_STAR]
+
+
+def check_size(operator: int, left: Any, right: Any):
+    """
+    Raises `BudgetExceeded` before the binary `operator` (a token type id)
+    is applied to two integers when either operand or the result may need
+    more than `MAX_INT_BITS` bits, or to two strings when their sum would
+    be longer than `MAX_STRING_LENGTH`.
+    """
+    if type(left) is int and type(right) is int:
+        left_bits = left.bit_length()
+        right_bits = right.bit_length()
+        if operator == STAR:
+            bits = left_bits + right_bits
+        elif operator == STAR_STAR:
+            bits = left_bits * right if abs(left) > 1 and right > 0 else left_bits
+        else:
+            bits = max(left_bits, right_bits) + 1
+        if bits > MAX_INT_BITS or right_bits > MAX_INT_BITS:
+            raise BudgetExceeded("[RUNTIME ERROR] Integer result is too large.")
+    elif type(left) is str and type(right) is str and operator == PLUS:
+        if len(left) + len(right) > MAX_STRING_LENGTH:
+            raise BudgetExceeded("[RUNTIME ERROR] String result is too large.")
+
+
+def sized(operator: int, operation: Callable[[Any, Any], Any]) -> Callable[[Any, Any], Any]:
+    def apply(left: Any, right: Any) -> Any:
+        if type(left) is int or type(left) is str:
+            check_size(operator, left, right)
+        return operation(left, right)
+    return apply
+
+
+# Binary operations by token type id, each checking its operands' size first.
+SIZED_BINARY_OPERATIONS = [
+    sized(type_id, BINARY_OPERATIONS[token_type]) if token_type in BINARY_OPERATIONS else None
+    for type_id, token_type in enumerate(TOKEN_TYPES)
+]
@@ -0,0 +1,176 @@
+import operator
+from typing import Any, Callable
+from .grammar import BinaryExpr, Expr, ExprElem, GroupExpr, LiteralExpr, NotImplementedExpr, UnaryExpr, VariableExpr
+from .token import TokenType
+
+
+class LoxRuntimeError(Exception):
+    pass
+
+
+def is_number(value: Any) -> bool:
+    return type(value) is int or type(value) is float
+
+
+def is_truthy(value: Any) -> bool:
+    return value is not None and value is not False
+
+
+def is_equal(left: Any, right: Any) -> bool:
+    # `True == 1` holds in Python but booleans and numbers never compare
+    # equal in Lox.
+    if type(left) is bool or type(right) is bool:
+        return type(left) is type(right) and left == right
+    return left == right
+
+
+def is_same(left: Any, right: Any) -> bool:
+    return type(left) is type(right) and left == right
+
+
+def add(left: Any, right: Any) -> Any:
+    if is_number(left) and is_number(right):
+        return left + right
+    if type(left) is str and type(right) is str:
+        return left + right
+    raise LoxRuntimeError("[RUNTIME ERROR] Operands must be two numbers or two strings.")
+
+
+def arithmetic(operation: Callable[[Any, Any], Any]) -> Callable[[Any, Any], Any]:
+    def apply(left: Any, right: Any) -> Any:
+        if not is_number(left) or not is_number(right):
+            raise LoxRuntimeError("[RUNTIME ERROR] Operands must be numbers.")
+        try:
+            result = operation(left, right)
+        except ZeroDivisionError:
+            raise LoxRuntimeError("[RUNTIME ERROR] Division by zero.")
+        except OverflowError:
+            raise LoxRuntimeError("[RUNTIME ERROR] Numeric result out of range.")
+        if type(result) is complex:
+            raise LoxRuntimeError("[RUNTIME ERROR] Numeric result is not a real number.")
+        return result
+    return apply
+
+
+def comparison(operation: Callable[[Any, Any], bool]) -> Callable[[Any, Any], bool]:
+    def apply(left: Any, right: Any) -> bool:
+        if not is_number(left) or not is_number(right):
+            raise LoxRuntimeError("[RUNTIME ERROR] Operands must be numbers.")
+        return operation(left, right)
+    return apply
+
+
+def negate(value: Any) -> Any:
+    if not is_number(value):
+        raise LoxRuntimeError("[RUNTIME ERROR] Operand must be a number.")
+    return -value
+
+
+BINARY_OPERATIONS: dict[TokenType, Callable[[Any, Any], Any]] = {
+    TokenType.PLUS: add,
+    TokenType.MINUS: arithmetic(operator.sub),
+    TokenType.STAR: arithmetic(operator.mul),
+    TokenType.SLASH: arithmetic(operator.truediv),
+    TokenType.STAR_STAR: arithmetic(operator.pow),
+    TokenType.SLASH_SLASH: arithmetic(operator.floordiv),
+    TokenType.GT: comparison(operator.gt),
+    TokenType.LT: comparison(operator.lt),
+    TokenType.GT_EQUAL: comparison(operator.ge),
+    TokenType.LT_EQUAL: comparison(operator.le),
+    TokenType.EQUAL_EQUAL: is_equal,
+    TokenType.BANG_EQUAL: lambda left, right: not is_equal(left, right),
+    TokenType.IS: is_same,
+}
+
+
+UNARY_OPERATIONS: dict[TokenType, Callable[[Any], Any]] = {
+    TokenType.MINUS: negate,
+    TokenType.NOT: lambda value: not is_truthy(value),
+}
+
+
+def lookup(env: dict[str, Any], name: str) -> Any:
+    try:
+        return env[name]
+    except KeyError:
+        raise LoxRuntimeError(f"[RUNTIME ERROR] Undefined variable '{name}'.")
+
+
+class Evaluator(Expr):
+    """
+    Evaluates an expression tree, reading its variables from `env`.
+    """
+    def __init__(self, env: dict[str, Any] | None = None) -> None:
+        self.env = env if env is not None else {}
+
+
+    def evaluate(self, expr: ExprElem):
+        return expr.accept(self)
+
+
+    def visit_binary(self, expr: BinaryExpr):
+        left = expr.left.accept(self)
+        right = expr.right.accept(self)
+        return BINARY_OPERATIONS[expr.operator](left, right)
+
+
+    def visit_unary(self, expr: UnaryExpr):
+        return UNARY_OPERATIONS[expr.symbol](expr.unary.accept(self))
+
+
+    def visit_group(self, expr: GroupExpr):
+        return expr.group.accept(self)
+
+
+    def visit_literal(self, expr: LiteralExpr):
+        return expr.value
+
+
+    def visit_variable(self, expr: VariableExpr):
+        return lookup(self.env, expr.name)
+
+
+    def visit_not_implemented_expr(self, expr: NotImplementedExpr):
+        raise LoxRuntimeError("[RUNTIME ERROR] Expression is not supported.")
+
+
+    @staticmethod
+    def stringify(value: Any) -> str:
+        match value:
+            case None:
+                return "nil"
+            case True:
+                return "true"
+            case False:
+                return "false"
+            case _:
+                return str(value)
+
+
+class MemoizingEvaluator(Evaluator):
+    """
+    Evaluator that remembers the value of every binary and unary node it has
+    evaluated. Paired with a `NodeInterner`, each distinct subexpression of
+    a script is computed only once, however often it occurs. The memo only
+    lasts one `evaluate` call, since `env` may change between calls.
+    """
+    def __init__(self, env: dict[str, Any] | None = None) -> None:
+        super().__init__(env)
+        self.memo: dict[ExprElem, Any] = {}
+
+
+    def evaluate(self, expr: ExprElem):
+        self.memo.clear()
+        return super().evaluate(expr)
+
+
+    def visit_binary(self, expr: BinaryExpr):
+        if expr not in self.memo:
+            self.memo[expr] = super().visit_binary(expr)
+        return self.memo[expr]
+
+
+    def visit_unary(self, expr: UnaryExpr):
+        if expr not in self.memo:
+            self.memo[expr] = super().visit_unary(expr)
+        return self.memo[expr]
@@ -0,0 +1,263 @@
+from array import array
+from enum import IntEnum
+from typing import Any, Callable
+from .evaluator import BINARY_OPERATIONS, UNARY_OPERATIONS, LoxRuntimeError, lookup
+from .grammar import BinaryExpr, ExprElem, GroupExpr, LiteralExpr, NotImplementedExpr, UnaryExpr, VariableExpr
+from .token import EOF_ID, TOKEN_TYPE_IDS, TOKEN_TYPES, TokenType
+
+
+class NodeKind(IntEnum):
+    BINARY = 0
+    UNARY = 1
+    GROUP = 2
+    LITERAL = 3
+    NOT_IMPLEMENTED = 4
+    VARIABLE = 5
+
+
+class FlatAst:
+    """
+    Expression tree stored as parallel arrays indexed by node id instead of
+    one object per node. `lefts` holds the only child of unary and group
+    nodes, the literal pool index of literal nodes and the name pool index
+    of variable nodes. Nodes are stored in post-order, so every child id is
+    lower than its parent's and the last node is the root.
+    """
+    def __init__(self) -> None:
+        self.kinds = array('B')
+        self.operators = array('B')
+        self.lefts = array('i')
+        self.rights = array('i')
+        self.literals: list[tuple[Any, TokenType | None, Any]] = []
+        self.literal_ids: dict[tuple[type, Any, TokenType | None], int] = {}
+        self.names: list[str] = []
+        self.name_ids: dict[str, int] = {}
+
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+
+    @property
+    def root(self) -> int:
+        return len(self.kinds) - 1
+
+
+    def add_node(self, kind: NodeKind, operator: TokenType | None = None, left: int = -1, right: int = -1) -> int:
+        self.kinds.append(kind)
+        self.operators.append(EOF_ID if operator is None else TOKEN_TYPE_IDS[operator])
+        self.lefts.append(left)
+        self.rights.append(right)
+        return len(self.kinds) - 1
+
+
+    def add_literal(self, literal: Any, kind: TokenType | None, value: Any) -> int:
+        key = (type(literal), literal, kind)
+        if key not in self.literal_ids:
+            self.literal_ids[key] = len(self.literals)
+            self.literals.append((literal, kind, value))
+        return self.add_node(NodeKind.LITERAL, left=self.literal_ids[key])
+
+
+    def add_variable(self, name: str) -> int:
+        if name not in self.name_ids:
+            self.name_ids[name] = len(self.names)
+            self.names.append(name)
+        return self.add_node(NodeKind.VARIABLE, left=self.name_ids[name])
+
+
+    def get_operator(self, index: int) -> TokenType:
+        return TOKEN_TYPES[self.operators[index]]
+
+
+    @staticmethod
+    def from_tree(expr: ExprElem) -> 'FlatAst':
+        flat = FlatAst()
+        ids: list[int] = []
+        # Nodes shared within `expr`, as built by a `NodeInterner`, are only
+        # stored once.
+        seen: dict[int, int] = {}
+        # Pairs of (node, children done); a node is emitted once both of its
+        # children have been.
+        stack: list[tuple[ExprElem, bool]] = [(expr, False)]
+        while stack:
+            node, children_done = stack.pop()
+            if id(node) in seen:
+                ids.append(seen[id(node)])
+                continue
+            match node:
+                case BinaryExpr() if children_done:
+                    right = ids.pop()
+                    left = ids.pop()
+                    ids.append(flat.add_node(NodeKind.BINARY, node.operator, left, right))
+                case BinaryExpr():
+                    stack.extend(((node, True), (node.right, False), (node.left, False)))
+                case UnaryExpr() if children_done:
+                    ids.append(flat.add_node(NodeKind.UNARY, node.symbol, ids.pop()))
+                case UnaryExpr():
+                    stack.extend(((node, True), (node.unary, False)))
+                case GroupExpr() if children_done:
+                    ids.append(flat.add_node(NodeKind.GROUP, left=ids.pop()))
+                case GroupExpr():
+                    stack.extend(((node, True), (node.group, False)))
+                case LiteralExpr():
+                    ids.append(flat.add_literal(node.literal, node.kind, node.value))
+                case VariableExpr():
+                    ids.append(flat.add_variable(node.name))
+                case _:
+                    ids.append(flat.add_node(NodeKind.NOT_IMPLEMENTED))
+            if children_done or not isinstance(node, (BinaryExpr, UnaryExpr, GroupExpr)):
+                seen[id(node)] = ids[-1]
+        return flat
+
+
+    def node(self, index: int | None = None) -> ExprElem:
+        """
+        Returns a view of node `index` (the root by default) that behaves
+        like the matching grammar node, so any `Expr` visitor can walk the
+        flat tree without it being rebuilt.
+        """
+        index = self.root if index is None else index
+        match self.kinds[index]:
+            case NodeKind.BINARY:
+                return _FlatBinary(self, index)
+            case NodeKind.UNARY:
+                return _FlatUnary(self, index)
+            case NodeKind.GROUP:
+                return _FlatGroup(self, index)
+            case NodeKind.LITERAL:
+                return _FlatLiteral(self, index)
+            case NodeKind.VARIABLE:
+                return _FlatVariable(self, index)
+            case _:
+                return NotImplementedExpr()
+
+
+class _FlatBinary(BinaryExpr):
+    def __init__(self, flat: FlatAst, index: int) -> None:
+        self.flat = flat
+        self.index = index
+
+
+    @property
+    def left(self):
+        return self.flat.node(self.flat.lefts[self.index])
+
+
+    @property
+    def right(self):
+        return self.flat.node(self.flat.rights[self.index])
+
+
+    @property
+    def operator(self):
+        return self.flat.get_operator(self.index)
+
+
+class _FlatUnary(UnaryExpr):
+    def __init__(self, flat: FlatAst, index: int) -> None:
+        self.flat = flat
+        self.index = index
+
+
+    @property
+    def unary(self):
+        return self.flat.node(self.flat.lefts[self.index])
+
+
+    @property
+    def symbol(self):
+        return self.flat.get_operator(self.index)
+
+
+class _FlatGroup(GroupExpr):
+    def __init__(self, flat: FlatAst, index: int) -> None:
+        self.flat = flat
+        self.index = index
+
+
+    @property
+    def group(self):
+        return self.flat.node(self.flat.lefts[self.index])
+
+
+class _FlatLiteral(LiteralExpr):
+    def __init__(self, flat: FlatAst, index: int) -> None:
+        self.flat = flat
+        self.index = index
+
+
+    @property
+    def literal(self):
+        return self.flat.literals[self.flat.lefts[self.index]][0]
+
+
+    @property
+    def kind(self):
+        return self.flat.literals[self.flat.lefts[self.index]][1]
+
+
+    @property
+    def value(self):
+        return self.flat.literals[self.flat.lefts[self.index]][2]
+
+
+class _FlatVariable(VariableExpr):
+    def __init__(self, flat: FlatAst, index: int) -> None:
+        self.flat = flat
+        self.index = index
+
+
+    @property
+    def name(self):
+        return self.flat.names[self.flat.lefts[self.index]]
+
+
+class FlatEvaluator:
+    @staticmethod
+    def evaluate(
+        flat: FlatAst,
+        env: dict[str, Any] | None = None,
+        before_node: Callable[[], Any] | None = None,
+        binary_operations: list[Callable[[Any, Any], Any] | None] | None = None
+    ) -> Any:
+        """
+        Evaluates every node in one forward pass over the arrays. Post-order
+        storage guarantees operands are computed before the nodes using
+        them, in the same order the tree-walking `Evaluator` visits them.
+        Variables are read from `env`. `before_node` is called before each
+        node, and `binary_operations`, indexed by token type id, replaces the
+        operations binary nodes apply; `Engine` uses both to bound requests.
+        """
+        env = env if env is not None else {}
+        names = flat.names
+        pool_values = [value for _, _, value in flat.literals]
+        if binary_operations is None:
+            binary_operations = [BINARY_OPERATIONS.get(token_type) for token_type in TOKEN_TYPES]
+        unary_operations = [UNARY_OPERATIONS.get(token_type) for token_type in TOKEN_TYPES]
+        operators = flat.operators
+        lefts = flat.lefts
+        rights = flat.rights
+        LITERAL = NodeKind.LITERAL.value
+        BINARY = NodeKind.BINARY.value
+        UNARY = NodeKind.UNARY.value
+        GROUP = NodeKind.GROUP.value
+        VARIABLE = NodeKind.VARIABLE.value
+        values: list[Any] = []
+        append = values.append
+        for index, kind in enumerate(flat.kinds):
+            if before_node is not None:
+                before_node()
+            if kind == LITERAL:
+                append(pool_values[lefts[index]])
+            elif kind == BINARY:
+                append(binary_operations[operators[index]](values[lefts[index]], values[rights[index]]))
+            elif kind == UNARY:
+                append(unary_operations[operators[index]](values[lefts[index]]))
+            elif kind == GROUP:
+                append(values[lefts[index]])
+            elif kind == VARIABLE:
+                append(lookup(env, names[lefts[index]]))
+            else:
+                raise LoxRuntimeError("[RUNTIME ERROR] Expression is not supported.")
+        return values[-1]
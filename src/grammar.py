@@ -1,5 +1,7 @@
 from abc import ABC, abstractmethod
+from typing import Any
 from src.token import TokenType
+from .constants import convert_literal
 
 
 class Expr(ABC):
@@ -23,6 +25,11 @@ class Expr(ABC):
         pass
 
 
+    @abstractmethod
+    def visit_variable(self, expr: 'VariableExpr'):
+        pass
+
+
     @abstractmethod
     def visit_not_implemented_expr(self, expr: 'NotImplementedExpr'):
         pass
@@ -69,14 +76,34 @@ class GroupExpr(ExprElem):
 
 
 class LiteralExpr(ExprElem):
-    def __init__(self, literal: str | int | float | bool | None) -> None:
+    """
+    A literal as written in the source. `literal` holds the lexeme of a
+    `kind` token, or the value itself when `kind` is None, and `value` the
+    runtime value, usually shared from the parser's `ConstantPool`. It is
+    converted from the lexeme here when not given.
+    """
+    def __init__(self, literal: str | int | float | bool | None, kind: TokenType | None = None, value: Any = None) -> None:
         self.literal = literal
+        self.kind = kind
+        if kind is None:
+            self.value = literal
+        else:
+            self.value = value if value is not None else convert_literal(literal, kind)
 
 
     def accept(self, expr: Expr):
         return expr.visit_literal(self)
 
 
+class VariableExpr(ExprElem):
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+
+    def accept(self, expr: Expr):
+        return expr.visit_variable(self)
+
+
 class NotImplementedExpr(ExprElem):
     def accept(self, expr: Expr):
         return expr.visit_not_implemented_expr(self)
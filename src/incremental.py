@@ -0,0 +1,253 @@
+from bisect import bisect_left
+from typing import List
+from .diagnostics import Diagnostic
+from .grammar import BinaryExpr, ExprElem, GroupExpr, UnaryExpr
+from .parser import Parser
+from .scanner import Scanner
+from .token import Token, TokenType
+
+
+class IncrementalDocument:
+    """
+    A source text kept scanned and parsed across edits. Each edit relexes
+    only the tokens around the changed text and, when the change falls
+    inside a parenthesized group, reparses only that group's contents and
+    splices the result into the existing tree, which is updated in place.
+
+    `diagnostics` holds every scan and syntax error of the current text. A
+    document with errors is rescanned and reparsed whole on each edit, so
+    the list stays complete, until an edit leaves it without errors again.
+    Parsing uses the Pratt parser, so nesting depth is not limited.
+    """
+    def __init__(self, source: str) -> None:
+        self.source = source
+        self.newlines: List[int] = []
+        self.tokens: List[Token] = []
+        self.tree: ExprElem | None = None
+        self.diagnostics: List[Diagnostic] = []
+        # Token index spans (open paren, close paren) of every parsed group,
+        # sorted by open index.
+        self.groups: List[tuple[int, int, GroupExpr]] = []
+        self.relexed_tokens = 0
+        self.reparsed_tokens = 0
+        self.rebuild()
+
+
+    def rebuild(self):
+        self.diagnostics = []
+        self.newlines = self.find_newlines(self.source, 0)
+        scanner = Scanner(self.source, diagnostics=self.diagnostics)
+        self.tokens = [Token.from_source(self.source, *span) for span in scanner.iter_spans()]
+        self.tree, self.groups = self.parse_tokens(self.tokens)
+        self.relexed_tokens = self.reparsed_tokens = len(self.tokens)
+
+
+    def edit(self, offset: int, deleted: int, inserted: str) -> ExprElem:
+        """
+        Replaces `deleted` characters at `offset` with `inserted` and returns
+        the updated tree.
+        """
+        old_source = self.source
+        self.source = old_source[:offset] + inserted + old_source[offset + deleted:]
+        if self.diagnostics:
+            self.rebuild()
+            return self.tree
+        first, old_stop, new_tokens = self.relex(old_source, offset, deleted, inserted)
+        if self.diagnostics:
+            # The rescanned text has errors.
+            self.rebuild()
+        elif first != old_stop or new_tokens:
+            self.reparse(first, old_stop, len(new_tokens))
+        else:
+            self.reparsed_tokens = 0
+        return self.tree
+
+
+    def relex(self, old_source: str, offset: int, deleted: int, inserted: str):
+        """
+        Rescans from the end of the last token before the edit until the new
+        token stream lines up with the old one again, then splices the new
+        tokens in. Returns the replaced old token range and its replacement.
+        """
+        old_newlines = self.newlines
+        delta = len(inserted) - deleted
+        edit_end = offset + len(inserted)
+        # Every token ending at or after `offset` may change, including one
+        # that merely touches it.
+        first = self.bisect_tokens(offset, old_newlines)
+        if first == 0:
+            pos, line = 0, 1
+        else:
+            pos = self.get_span(self.tokens[first - 1], old_newlines)[1]
+            line = self.tokens[first - 1].row[1]
+        col_offset = 0 if line == 1 else old_newlines[line - 2]
+        new_tokens: List[Token] = []
+        old_index = first
+        resynced = False
+        for span in Scanner(self.source, diagnostics=self.diagnostics).iter_spans(pos, line, col_offset):
+            token_type, start, end, _, _ = span
+            if start >= edit_end:
+                while old_index < len(self.tokens) and self.get_span(self.tokens[old_index], old_newlines)[0] < start - delta:
+                    old_index += 1
+                if old_index < len(self.tokens) and self.same_span(self.tokens[old_index], old_newlines, token_type, start - delta, end - delta):
+                    resynced = True
+                    break
+            new_tokens.append(Token.from_source(self.source, *span))
+        if not resynced:
+            old_index = len(self.tokens)
+        self.relexed_tokens = len(new_tokens)
+        # Drop rescanned tokens identical to the old ones before the edit.
+        unchanged = 0
+        while (unchanged < len(new_tokens) and first + unchanged < old_index
+               and self.same_token(new_tokens[unchanged], self.tokens[first + unchanged])):
+            unchanged += 1
+        first += unchanged
+        new_tokens = new_tokens[unchanged:]
+        self.shift_tokens(old_index, old_source, offset, deleted, inserted)
+        self.tokens[first:old_index] = new_tokens
+        return first, old_index, new_tokens
+
+
+    def shift_tokens(self, start_index: int, old_source: str, offset: int, deleted: int, inserted: str):
+        """
+        Moves the reused tokens from `start_index` on past the edit, and
+        updates the newline table for the new text.
+        """
+        old_newlines = self.newlines
+        delta = len(inserted) - deleted
+        low = bisect_left(old_newlines, offset)
+        high = bisect_left(old_newlines, offset + deleted)
+        new_newlines = old_newlines[:low] + self.find_newlines(inserted, offset) + [index + delta for index in old_newlines[high:]]
+        line_delta = len(new_newlines) - len(old_newlines)
+        # Only tokens on the line the edit ends on move within their line.
+        edit_end_line = high + 1
+        for index in range(start_index, len(self.tokens)):
+            token = self.tokens[index]
+            if token.row[0] == edit_end_line:
+                start, end = self.get_span(token, old_newlines)
+                line = token.row[0] + line_delta
+                col_offset = 0 if line == 1 else new_newlines[line - 2]
+                self.tokens[index] = Token.from_source(self.source, token.type, start + delta, end + delta, line, col_offset)
+            elif line_delta:
+                token.row = (token.row[0] + line_delta, token.row[1] + line_delta)
+            else:
+                break
+        self.newlines = new_newlines
+
+
+    def reparse(self, first: int, old_stop: int, new_count: int):
+        token_delta = new_count - (old_stop - first)
+        group = self.find_enclosing_group(first, old_stop)
+        if group is not None:
+            open_index, close_index, node = group
+            new_close = close_index + token_delta
+            body = self.tokens[open_index + 1:new_close]
+            diagnostics: List[Diagnostic] = []
+            inner = Parser(body, "pratt", diagnostics=diagnostics).parse()
+            # A body with errors may not be a group's contents at all, as
+            # when an edit adds a parenthesis; the whole text is reparsed.
+            if not diagnostics:
+                node.group = inner
+                inner_groups = self.find_groups(inner, body)
+                before, after = [], []
+                for start, end, entry_node in self.groups:
+                    if start <= open_index:
+                        before.append((start, end + token_delta if end >= close_index else end, entry_node))
+                    elif start > close_index:
+                        after.append((start + token_delta, end + token_delta, entry_node))
+                inner_groups = [(start + open_index + 1, end + open_index + 1, inner_node) for start, end, inner_node in inner_groups]
+                self.groups = before + inner_groups + after
+                self.reparsed_tokens = new_close - open_index + 1
+                return
+        self.tree, self.groups = self.parse_tokens(self.tokens)
+        self.reparsed_tokens = len(self.tokens)
+
+
+    def find_enclosing_group(self, first: int, old_stop: int):
+        """
+        Returns the innermost group whose parentheses are outside the old
+        token range `[first, old_stop)` that was replaced.
+        """
+        best = None
+        for entry in self.groups:
+            open_index, close_index, _ = entry
+            if open_index >= first:
+                break
+            if close_index >= old_stop and (best is None or open_index > best[0]):
+                best = entry
+        return best
+
+
+    def parse_tokens(self, tokens: List[Token]):
+        expr = Parser(tokens, "pratt", diagnostics=self.diagnostics).parse()
+        # Groups are only reparsed in place while the document has no errors.
+        return expr, [] if self.diagnostics else self.find_groups(expr, tokens)
+
+
+    def find_groups(self, expr: ExprElem, tokens: List[Token]) -> List[tuple[int, int, GroupExpr]]:
+        """
+        Returns the token index span of every group in `expr`, sorted by
+        open index. `expr` must have been parsed from `tokens` without
+        errors, so that each open parenthesis starts a group and the groups
+        met in a left-to-right walk of the tree match them in order.
+        """
+        closes: dict[int, int] = {}
+        opened: List[int] = []
+        for index, token in enumerate(tokens):
+            if token.type == TokenType.PAREN_OPEN:
+                opened.append(index)
+            elif token.type == TokenType.PAREN_CLOSE:
+                closes[opened.pop()] = index
+        opens = sorted(closes)
+        groups: List[tuple[int, int, GroupExpr]] = []
+        stack = [expr]
+        while stack:
+            node = stack.pop()
+            match node:
+                case BinaryExpr():
+                    stack.extend((node.right, node.left))
+                case UnaryExpr():
+                    stack.append(node.unary)
+                case GroupExpr():
+                    open_index = opens[len(groups)]
+                    groups.append((open_index, closes[open_index], node))
+                    stack.append(node.group)
+        return groups
+
+
+    def bisect_tokens(self, offset: int, newlines: List[int]) -> int:
+        low, high = 0, len(self.tokens)
+        while low < high:
+            middle = (low + high) // 2
+            if self.get_span(self.tokens[middle], newlines)[1] < offset:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+
+    def get_span(self, token: Token, newlines: List[int]) -> tuple[int, int]:
+        """
+        Returns the `[start, end)` offsets of `token` from its row and column,
+        which are measured from the newline ending the previous line.
+        """
+        start_offset = 0 if token.row[0] == 1 else newlines[token.row[0] - 2]
+        end_offset = 0 if token.row[1] == 1 else newlines[token.row[1] - 2]
+        return start_offset + token.col[0], end_offset + token.col[1] + 1
+
+
+    def same_span(self, token: Token, newlines: List[int], token_type: TokenType, start: int, end: int) -> bool:
+        return token.type == token_type and self.get_span(token, newlines) == (start, end)
+
+
+    def same_token(self, new: Token, old: Token) -> bool:
+        return new.type == old.type and new.lexeme == old.lexeme and new.row == old.row and new.col == old.col
+
+
+    def find_newlines(self, text: str, base: int) -> List[int]:
+        newlines = []
+        index = text.find("\n")
+        while index != -1:
+            newlines.append(base + index)
+            index = text.find("\n", index + 1)
+        return newlines
@@ -0,0 +1,66 @@
+from typing import Any
+from .grammar import BinaryExpr, ExprElem, GroupExpr, LiteralExpr, NotImplementedExpr, UnaryExpr, VariableExpr
+from .token import TokenType
+
+
+class NodeFactory:
+    """
+    Builds the nodes a parser produces. The default factory calls the node
+    classes directly.
+    """
+    binary = BinaryExpr
+    unary = UnaryExpr
+    group = GroupExpr
+    literal = LiteralExpr
+    variable = VariableExpr
+    not_implemented = NotImplementedExpr
+
+
+class NodeInterner(NodeFactory):
+    """
+    Node factory that hands back the existing node whenever a structurally
+    identical one has been built before, turning repeated subexpressions
+    into shared nodes of a DAG. Children are interned before their parents,
+    so two subtrees are identical exactly when their children are the same
+    objects. Nodes must not be mutated once built. One interner can be
+    shared by several parses to share nodes across them.
+    """
+    def __init__(self) -> None:
+        self.nodes: dict[tuple, ExprElem] = {}
+        self.not_implemented_node = NotImplementedExpr()
+
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+
+    def intern(self, key: tuple, build) -> ExprElem:
+        node = self.nodes.get(key)
+        if node is None:
+            node = self.nodes[key] = build()
+        return node
+
+
+    def binary(self, left: ExprElem, operator: TokenType, right: ExprElem) -> ExprElem:
+        return self.intern((BinaryExpr, id(left), operator, id(right)), lambda: BinaryExpr(left, operator, right))
+
+
+    def unary(self, symbol: TokenType, unary: ExprElem) -> ExprElem:
+        return self.intern((UnaryExpr, symbol, id(unary)), lambda: UnaryExpr(symbol, unary))
+
+
+    def group(self, group: ExprElem) -> ExprElem:
+        return self.intern((GroupExpr, id(group)), lambda: GroupExpr(group))
+
+
+    def literal(self, literal: Any, kind: TokenType | None = None, value: Any = None) -> ExprElem:
+        # The value's type is part of the key since `1 == 1.0 == True`.
+        return self.intern((LiteralExpr, type(literal), literal, kind), lambda: LiteralExpr(literal, kind, value))
+
+
+    def variable(self, name: str) -> ExprElem:
+        return self.intern((VariableExpr, name), lambda: VariableExpr(name))
+
+
+    def not_implemented(self) -> ExprElem:
+        return self.not_implemented_node
@@ -1,15 +1,197 @@
+import mmap
+import os
+from typing import Any, Callable, TextIO
 from src.ast import AstParser
 from .scanner import Scanner
 from .parser import Parser
+from .evaluator import Evaluator, LoxRuntimeError, MemoizingEvaluator
+from .interning import NodeInterner
+from .closure_compiler import ClosureCompiler
+from .bytecode import BytecodeCompiler
+from .vm import VM
+from .optimizer import Optimizer
+from .cache import ScriptCache
+from .flat_ast import FlatAst, FlatEvaluator
+from .profiler import PhaseProfiler, count_nodes, measure
+from .diagnostics import Diagnostic, LoxSyntaxError
+from .symbols import SymbolTable
 
 class Interpreter:
     @staticmethod
-    def run_script(source):
-        tokens = Scanner(source).scan()
-        expr = Parser(tokens).parse()
-        AstParser.print(expr)
+    def run_script(
+        source: str | TextIO,
+        show_ast: bool = False,
+        backend: str = "tree",
+        optimize: bool = False,
+        intern: bool = False,
+        profiler: PhaseProfiler | None = None,
+        env: dict[str, Any] | None = None,
+        parser: str = "pratt"
+    ):
+        expr = Interpreter.parse(source, intern, profiler, parser=parser)
+        return Interpreter.run_expr(expr, show_ast, backend, optimize, intern, profiler, env)
+
+
+    @staticmethod
+    def run_file(
+        path: str,
+        use_cache: bool = True,
+        show_ast: bool = False,
+        backend: str = "tree",
+        optimize: bool = False,
+        intern: bool = False,
+        profiler: PhaseProfiler | None = None,
+        mapped: bool = False,
+        scan_workers: int | None = None,
+        parser: str = "pratt"
+    ):
+        """
+        Runs the script at `path`, reusing its parsed tree from the on-disk
+        cache when the file has not changed since it was last parsed.
+        """
+        cache = ScriptCache(path) if use_cache else None
+        expr = measure(profiler, "cache_load", cache.load) if cache else None
+        if expr is None:
+            expr = Interpreter.parse_file(path, intern, profiler, mapped, scan_workers, parser)
+            if cache:
+                measure(profiler, "cache_store", lambda: cache.store(expr))
+        return Interpreter.run_expr(expr, show_ast, backend, optimize, intern, profiler)
+
+
+    @staticmethod
+    def parse_file(
+        path: str,
+        intern: bool = False,
+        profiler: PhaseProfiler | None = None,
+        mapped: bool = False,
+        scan_workers: int | None = None,
+        parser: str = "pratt"
+    ):
+        """
+        Parses the script at `path`, streaming it in chunks or, when `mapped`
+        is set, scanning its bytes in place through `mmap` so that not even
+        one decoded copy of a very large file is held in memory. With
+        `scan_workers`, the whole file is scanned in that many processes.
+        """
+        if not mapped:
+            with open(path, encoding="utf-8") as f:
+                # Parallel scanning splits the whole source up front.
+                source = f.read() if scan_workers else f
+                return Interpreter.parse(source, intern, profiler, scan_workers, parser)
+        with open(path, "rb") as f:
+            # Empty files cannot be mapped.
+            if os.fstat(f.fileno()).st_size == 0:
+                return Interpreter.parse(b"", intern, profiler, parser=parser)
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as source:
+                return Interpreter.parse(source, intern, profiler, scan_workers, parser, path)
+
+
+    @staticmethod
+    def parse(
+        source: str | bytes | mmap.mmap | TextIO,
+        intern: bool = False,
+        profiler: PhaseProfiler | None = None,
+        scan_workers: int | None = None,
+        parser: str = "pratt",
+        path: str | None = None
+    ):
+        """
+        Scans and parses `source`, raising a `LoxSyntaxError` with every scan
+        and syntax error found once the whole source has been read. A source
+        that is not a stream is scanned in `scan_workers` processes if given;
+        when it maps the file at `path`, the workers map the file themselves.
+        `parser` selects the `Parser` engine: "pratt", which handles nesting
+        of any depth, or "recursive".
+        The scanner and parser share one symbol table, so every occurrence of
+        a variable name ends up as the same string.
+        """
+        diagnostics: list[Diagnostic] = []
+        symbols = SymbolTable()
+        match source:
+            case str() | bytes() | mmap.mmap():
+                scanner = Scanner(source, diagnostics=diagnostics, symbols=symbols)
+                scan = (lambda: scanner.scan_parallel(scan_workers, path=path)) if scan_workers else scanner.scan_buffer
+                tokens = measure(profiler, "scan", scan, len, "tokens")
+            case _ if profiler is None:
+                tokens = Scanner(source, diagnostics=diagnostics, symbols=symbols).iter_tokens()
+            case _:
+                # Streaming interleaves scanning with parsing, so the phases
+                # are only measured apart on a fully read source.
+                text = source.read()
+                scanner = Scanner(text, diagnostics=diagnostics, symbols=symbols)
+                tokens = measure(profiler, "scan", scanner.scan_buffer, len, "tokens")
+        nodes = NodeInterner() if intern else None
+        parse = Parser(tokens, parser, nodes, diagnostics, symbols).parse
+        try:
+            expr = measure(profiler, "parse", parse, count_nodes, "nodes")
+        except RecursionError:
+            # Only the recursive parser can run out of stack.
+            message = "Expression is nested too deeply for the recursive parser."
+            raise LoxSyntaxError(diagnostics + [Diagnostic.after_token("SYNTAX ERROR", message, None)])
+        if diagnostics:
+            raise LoxSyntaxError(diagnostics)
+        return expr
+
+
+    @staticmethod
+    def run_expr(
+        expr,
+        show_ast: bool = False,
+        backend: str = "tree",
+        optimize: bool = False,
+        intern: bool = False,
+        profiler: PhaseProfiler | None = None,
+        env: dict[str, Any] | None = None
+    ):
+        """
+        Evaluates a parsed `expr`. Backends that walk the tree recursively
+        raise a `LoxRuntimeError` on trees nested past the recursion limit.
+        """
+        try:
+            if optimize:
+                expr, removed = measure(profiler, "optimize", lambda: Optimizer.optimize(expr))
+            if show_ast:
+                measure(profiler, "print", lambda: AstParser.print(expr), lambda _: count_nodes(expr), "nodes")
+                if optimize:
+                    print(f"Optimizer removed {removed} nodes")
+            compiled = measure(profiler, "compile", lambda: Interpreter.compile(expr, backend, intern, env))
+            if profiler is not None and profiler.count_nodes:
+                profiler.record_node_counts(expr, env)
+            return measure(profiler, "evaluate", compiled, lambda _: count_nodes(expr), "nodes")
+        except RecursionError:
+            raise LoxRuntimeError("[RUNTIME ERROR] Expression is nested too deeply.")
+
+
+    @staticmethod
+    def compile(
+        expr,
+        backend: str = "tree",
+        intern: bool = False,
+        env: dict[str, Any] | None = None
+    ) -> Callable[[], Any]:
+        """
+        Prepares `expr` for `backend` and returns a callable that evaluates
+        it, so the preparation can be reused across evaluations. Variables
+        are read from `env` on each call, so it may change between them.
+        """
+        match backend:
+            case "tree":
+                evaluator = MemoizingEvaluator(env) if intern else Evaluator(env)
+                return lambda: evaluator.evaluate(expr)
+            case "closure":
+                return ClosureCompiler.compile(expr, env)
+            case "vm":
+                chunk = BytecodeCompiler.compile(expr)
+                return lambda: VM.run(chunk, env)
+            case "flat":
+                flat = FlatAst.from_tree(expr)
+                return lambda: FlatEvaluator.evaluate(flat, env)
+            case _:
+                raise Exception(f"Unknown backend: {backend}")
 
 
     @staticmethod
     def run_repl():
-        print("REPL not yet implemented.")
+        # The REPL builds on `Interpreter`, so it is only imported on use.
+        from .repl import Repl
+        Repl().run()
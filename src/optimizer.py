@@ -0,0 +1,142 @@
+from .evaluator import BINARY_OPERATIONS, UNARY_OPERATIONS, LoxRuntimeError, is_number
+from .grammar import BinaryExpr, Expr, ExprElem, GroupExpr, LiteralExpr, NotImplementedExpr, UnaryExpr, VariableExpr
+from .token import TokenType
+
+
+# Operators whose result is always a boolean (or a runtime error).
+BOOLEAN_OPERATORS = frozenset({
+    TokenType.GT,
+    TokenType.LT,
+    TokenType.GT_EQUAL,
+    TokenType.LT_EQUAL,
+    TokenType.EQUAL_EQUAL,
+    TokenType.BANG_EQUAL,
+    TokenType.IS,
+    TokenType.NOT,
+})
+
+
+# Operators whose result is always a number (or a runtime error).
+NUMERIC_OPERATORS = frozenset({
+    TokenType.MINUS,
+    TokenType.STAR,
+    TokenType.SLASH,
+    TokenType.STAR_STAR,
+    TokenType.SLASH_SLASH,
+})
+
+
+class Optimizer:
+    @staticmethod
+    def optimize(expr: ExprElem) -> tuple[ExprElem, int]:
+        """
+        Folds literal-only subtrees, drops group wrappers and removes double
+        negations that cannot change the result. Returns the simplified tree
+        along with the number of nodes removed. `expr` is left untouched.
+        """
+        optimized = expr.accept(_Optimizer())
+        return optimized, _NodeCounter.count(expr) - _NodeCounter.count(optimized)
+
+
+class _Optimizer(Expr):
+    def visit_binary(self, expr: BinaryExpr):
+        left = expr.left.accept(self)
+        right = expr.right.accept(self)
+        if isinstance(left, LiteralExpr) and isinstance(right, LiteralExpr):
+            try:
+                return LiteralExpr(BINARY_OPERATIONS[expr.operator](left.value, right.value))
+            except LoxRuntimeError:
+                # Leave it for the evaluator to report at runtime.
+                pass
+        if left is expr.left and right is expr.right:
+            return expr
+        return BinaryExpr(left, expr.operator, right)
+
+
+    def visit_unary(self, expr: UnaryExpr):
+        unary = expr.unary.accept(self)
+        if isinstance(unary, LiteralExpr):
+            try:
+                return LiteralExpr(UNARY_OPERATIONS[expr.symbol](unary.value))
+            except LoxRuntimeError:
+                pass
+        if isinstance(unary, UnaryExpr) and unary.symbol == expr.symbol:
+            inner = unary.unary
+            match expr.symbol:
+                case TokenType.NOT if self.is_boolean(inner):
+                    return inner
+                case TokenType.MINUS if self.is_numeric(inner):
+                    return inner
+        if unary is expr.unary:
+            return expr
+        return UnaryExpr(expr.symbol, unary)
+
+
+    def visit_group(self, expr: GroupExpr):
+        # The tree shape already encodes grouping; the wrapper only matters
+        # when printing.
+        return expr.group.accept(self)
+
+
+    def visit_literal(self, expr: LiteralExpr):
+        return expr
+
+
+    def visit_variable(self, expr: VariableExpr):
+        return expr
+
+
+    def visit_not_implemented_expr(self, expr: NotImplementedExpr):
+        return expr
+
+
+    def is_boolean(self, expr: ExprElem) -> bool:
+        match expr:
+            case BinaryExpr():
+                return expr.operator in BOOLEAN_OPERATORS
+            case UnaryExpr():
+                return expr.symbol in BOOLEAN_OPERATORS
+            case LiteralExpr():
+                return type(expr.value) is bool
+        return False
+
+
+    def is_numeric(self, expr: ExprElem) -> bool:
+        match expr:
+            case BinaryExpr():
+                return expr.operator in NUMERIC_OPERATORS
+            case UnaryExpr():
+                return expr.symbol in NUMERIC_OPERATORS
+            case LiteralExpr():
+                return is_number(expr.value)
+        return False
+
+
+class _NodeCounter(Expr):
+    @staticmethod
+    def count(expr: ExprElem) -> int:
+        return expr.accept(_NodeCounter())
+
+
+    def visit_binary(self, expr: BinaryExpr):
+        return 1 + expr.left.accept(self) + expr.right.accept(self)
+
+
+    def visit_unary(self, expr: UnaryExpr):
+        return 1 + expr.unary.accept(self)
+
+
+    def visit_group(self, expr: GroupExpr):
+        return 1 + expr.group.accept(self)
+
+
+    def visit_literal(self, expr: LiteralExpr):
+        return 1
+
+
+    def visit_variable(self, expr: VariableExpr):
+        return 1
+
+
+    def visit_not_implemented_expr(self, expr: NotImplementedExpr):
+        return 1
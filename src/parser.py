@@ -1,15 +1,95 @@
-from typing import List
-from .grammar import BinaryExpr, LiteralExpr, NotImplementedExpr, UnaryExpr, GroupExpr
-from .token import Token, TokenType
+from array import array
+from typing import Iterable, Iterator, List
+from .constants import ConstantPool
+from .diagnostics import Diagnostic
+from .interning import NodeFactory
+from .symbols import SymbolTable
+from .token import EOF_ID, TOKEN_TYPE_IDS, TOKEN_TYPES, Token, TokenBuffer, TokenType
+
+
+def token_ids(*token_types: TokenType) -> frozenset[int]:
+    return frozenset(TOKEN_TYPE_IDS[token_type] for token_type in token_types)
+
+
+# Token classes matched by each precedence level, as sets of type ids so a
+# level needs a single membership test per token.
+EQUALITY_IDS = token_ids(TokenType.EQUAL_EQUAL, TokenType.BANG_EQUAL, TokenType.IS)
+COMPARISON_IDS = token_ids(TokenType.GT, TokenType.LT, TokenType.GT_EQUAL, TokenType.LT_EQUAL)
+TERM_IDS = token_ids(TokenType.PLUS, TokenType.MINUS)
+FACTOR_IDS = token_ids(TokenType.STAR, TokenType.SLASH, TokenType.STAR_STAR, TokenType.SLASH_SLASH)
+UNARY_IDS = token_ids(TokenType.MINUS, TokenType.NOT)
+LEXEME_LITERAL_IDS = token_ids(TokenType.STRING, TokenType.INTEGER, TokenType.FLOAT)
+TRUE_ID = TOKEN_TYPE_IDS[TokenType.TRUE]
+FALSE_ID = TOKEN_TYPE_IDS[TokenType.FALSE]
+NIL_ID = TOKEN_TYPE_IDS[TokenType.NIL]
+IDENT_ID = TOKEN_TYPE_IDS[TokenType.IDENT]
+PAREN_OPEN_ID = TOKEN_TYPE_IDS[TokenType.PAREN_OPEN]
+PAREN_CLOSE_ID = TOKEN_TYPE_IDS[TokenType.PAREN_CLOSE]
+BINARY_IDS = EQUALITY_IDS | COMPARISON_IDS | TERM_IDS | FACTOR_IDS
+# Tokens a missing operand is reported before rather than skipped, so the
+# enclosing rule can carry on from them.
+RESUME_IDS = BINARY_IDS | token_ids(TokenType.PAREN_CLOSE, TokenType.EOF)
 
 
 class Parser:
-    def __init__(self, tokens: List[Token]) -> None:
+    """
+    Parses `tokens` into an expression tree. Syntax errors produce
+    `NotImplementedExpr` nodes; when a `diagnostics` list is given they are
+    also recorded in it, and the parser skips stray tokens and keeps going so
+    that one pass finds every error. Variable names are interned into
+    `symbols`, which can be shared with the scanner that produced `tokens`.
+    Literal lexemes are converted once into values shared from `constants`.
+    """
+    def __init__(
+        self,
+        tokens: Iterable[Token],
+        engine: str = "recursive",
+        nodes: NodeFactory | None = None,
+        diagnostics: List[Diagnostic] | None = None,
+        symbols: SymbolTable | None = None,
+        constants: ConstantPool | None = None
+    ) -> None:
         self.tokens = tokens
+        self.engine = engine
+        self.nodes = nodes if nodes is not None else NodeFactory()
+        self.diagnostics = diagnostics
+        self.symbols = symbols if symbols is not None else SymbolTable()
+        self.constants = constants if constants is not None else ConstantPool()
 
 
     def parse(self):
-        return _Parser(self.tokens).parse()
+        match self.tokens:
+            case list():
+                parser = _Parser(self.tokens)
+            case TokenBuffer():
+                parser = _BufferParser(self.tokens)
+            case _:
+                parser = _StreamParser(iter(self.tokens))
+        parser.nodes = self.nodes
+        parser.diagnostics = self.diagnostics
+        parser.symbols = self.symbols
+        parser.constants = self.constants
+        match self.engine:
+            case "recursive":
+                parse = parser.parse
+            case "pratt":
+                parse = _PrattParser(parser).parse
+            case _:
+                raise Exception(f"Unknown parser engine: {self.engine}")
+        expr = parse()
+        if self.diagnostics is not None:
+            while parser.is_not_eof():
+                # Skip the stray token and parse what follows for errors. The
+                # expression most likely carries on past it, so an operator
+                # right after it is skipped too instead of reported as
+                # missing its left operand.
+                parser.error("Expected end of expression.")
+                parser.advance()
+                if parser.get_current_id() in BINARY_IDS:
+                    parser.advance()
+                if parser.is_not_eof():
+                    parse()
+        return expr
 
 
 class _Parser:
@@ -17,6 +97,15 @@ class _Parser:
         self.tokens = tokens
         self.current = 0
         self.total_tokens = len(tokens)
+        self.nodes = NodeFactory()
+        self.symbols = SymbolTable()
+        self.constants = ConstantPool()
+        self.diagnostics: List[Diagnostic] | None = None
+        self.error_line = 0
+        # Type ids of every token followed by the EOF sentinel, which no
+        # token class contains.
+        self.types = array('B', [TOKEN_TYPE_IDS[token.type] for token in tokens])
+        self.types.append(EOF_ID)
 
 
     def parse(self):
@@ -29,74 +118,143 @@ class _Parser:
 
     def equality(self):
         expr = self.comparison()
-        while self.match(TokenType.EQUAL_EQUAL, TokenType.BANG_EQUAL, TokenType.IS):
-            operator = self.get_previous_token()
+        while (operator := self.match_operator(EQUALITY_IDS)) is not None:
             right = self.comparison()
-            expr = BinaryExpr(expr, operator.type, right)
+            expr = self.nodes.binary(expr, operator, right)
         return expr
 
 
     def comparison(self):
         expr = self.term()
-        while self.match(TokenType.GT, TokenType.LT, TokenType.GT_EQUAL, TokenType.LT_EQUAL):
-            operator = self.get_previous_token()
+        while (operator := self.match_operator(COMPARISON_IDS)) is not None:
             right = self.term()
-            expr = BinaryExpr(expr, operator.type, right)
+            expr = self.nodes.binary(expr, operator, right)
         return expr
 
 
     def term(self):
         expr = self.factor()
-        while self.match(TokenType.PLUS, TokenType.MINUS):
-            operator = self.get_previous_token()
+        while (operator := self.match_operator(TERM_IDS)) is not None:
             right = self.factor()
-            expr = BinaryExpr(expr, operator.type, right)
+            expr = self.nodes.binary(expr, operator, right)
         return expr
 
 
     def factor(self):
         expr = self.unary()
-        while self.match(TokenType.STAR, TokenType.SLASH, TokenType.STAR_STAR, TokenType.SLASH_SLASH):
-            operator = self.get_previous_token()
+        while (operator := self.match_operator(FACTOR_IDS)) is not None:
             right = self.unary()
-            expr = BinaryExpr(expr, operator.type, right)
+            expr = self.nodes.binary(expr, operator, right)
         return expr
 
 
     def unary(self):
-        while self.match(TokenType.MINUS, TokenType.NOT):
-            operator = self.get_previous_token()
+        if (operator := self.match_operator(UNARY_IDS)) is not None:
             right = self.unary()
-            return UnaryExpr(operator.type, right)
+            return self.nodes.unary(operator, right)
         return self.primary()
 
 
     def primary(self):
-        if self.match(TokenType.TRUE):
-            return LiteralExpr(True) 
-        elif self.match(TokenType.FALSE):
-            return LiteralExpr(False) 
-        elif self.match(TokenType.NIL):
-            return LiteralExpr(None) 
-        elif self.match(TokenType.STRING, TokenType.INTEGER, TokenType.FLOAT):
-            return LiteralExpr(self.get_previous_token().lexeme) 
-        elif self.match(TokenType.PAREN_OPEN):
+        atom = self.atom()
+        if atom is not None:
+            return atom
+        elif self.match_id(PAREN_OPEN_ID):
             expr = self.expression()
-            if self.match(TokenType.PAREN_CLOSE):
-                return GroupExpr(expr)
-        return NotImplementedExpr()
+            if self.match_id(PAREN_CLOSE_ID):
+                return self.nodes.group(expr)
+            self.error("Expected ')' after expression.")
+        else:
+            self.error_at_operand()
+        return self.nodes.not_implemented()
+
+
+    def atom(self):
+        """
+        Consumes a variable or a literal and returns its node, otherwise
+        returns None.
+        """
+        if self.get_current_id() == IDENT_ID:
+            self.advance()
+            return self.nodes.variable(self.symbols.intern(self.get_previous_lexeme()))
+        return self.literal()
+
+
+    def literal(self):
+        type_id = self.get_current_id()
+        if type_id in LEXEME_LITERAL_IDS:
+            self.advance()
+            lexeme = self.get_previous_lexeme()
+            kind = TOKEN_TYPES[type_id]
+            try:
+                value = self.constants.convert(lexeme, kind)
+            except ValueError:
+                # A malformed number, which the scanner has reported.
+                return self.nodes.not_implemented()
+            return self.nodes.literal(lexeme, kind, value)
+        elif type_id == TRUE_ID:
+            self.advance()
+            return self.nodes.literal(True)
+        elif type_id == FALSE_ID:
+            self.advance()
+            return self.nodes.literal(False)
+        elif type_id == NIL_ID:
+            self.advance()
+            return self.nodes.literal(None)
+        return None
+
+
+    def error_at_operand(self):
+        """
+        Reports a missing operand and skips the current token unless the
+        enclosing rule can resume from it.
+        """
+        if self.diagnostics is None:
+            return
+        self.error("Expected expression.")
+        if self.get_current_id() not in RESUME_IDS:
+            self.advance()
+
+
+    def error(self, message: str):
+        """
+        Records a syntax error at the current token. Like panic mode, errors
+        on the line of the last reported one are dropped as likely fallout
+        from it; reporting resumes on the next line.
+        """
+        if self.diagnostics is None:
+            return
+        if self.is_not_eof():
+            diagnostic = Diagnostic.at_token("SYNTAX ERROR", message, self.get_current_token())
+        else:
+            diagnostic = Diagnostic.after_token("SYNTAX ERROR", message, self.get_previous_token())
+        if diagnostic.row[0] <= self.error_line:
+            return
+        self.error_line = diagnostic.row[0]
+        self.diagnostics.append(diagnostic)
+
+
+    def match_operator(self, token_ids: frozenset[int]) -> TokenType | None:
+        """
+        Consumes the current token if its type is in `token_ids` and returns
+        that type, otherwise returns None.
+        """
+        type_id = self.types[self.current]
+        if type_id in token_ids:
+            self.current += 1
+            return TOKEN_TYPES[type_id]
+        return None
 
 
-    def match(self, *token_types: TokenType):
-        for token_type in token_types:
-            if self.check(token_type):
-                self.advance()
-                return True
+    def match_id(self, type_id: int) -> bool:
+        if self.types[self.current] == type_id:
+            self.current += 1
+            return True
         return False
 
 
-    def check(self, token_type: TokenType):
-        return self.is_not_eof() and self.tokens[self.current].type == token_type
+    def get_current_id(self) -> int:
+        return self.types[self.current]
 
 
     def get_current_token(self):
@@ -104,7 +262,11 @@ class _Parser:
 
 
     def get_previous_token(self):
-        return self.tokens[self.current - 1]
+        return self.tokens[self.current - 1] if self.current else None
+
+
+    def get_previous_lexeme(self):
+        return self.get_previous_token().lexeme
 
 
     def advance(self):
@@ -114,3 +276,166 @@ class _Parser:
 
     def is_not_eof(self):
         return self.current < self.total_tokens
+
+
+class _StreamParser(_Parser):
+    """
+    Parses tokens pulled from an iterator, such as `Scanner.iter_tokens()`.
+    The grammar only ever looks at the current and previous tokens, so no
+    more than those two are held at any time.
+    """
+    def __init__(self, tokens: Iterator[Token]) -> None:
+        self.tokens = tokens
+        self.nodes = NodeFactory()
+        self.symbols = SymbolTable()
+        self.constants = ConstantPool()
+        self.diagnostics: List[Diagnostic] | None = None
+        self.error_line = 0
+        self.previous_token: Token | None = None
+        self.current_token: Token | None = None
+        self.current_id = EOF_ID
+        self.advance_stream()
+
+
+    def match_operator(self, token_ids: frozenset[int]) -> TokenType | None:
+        if self.current_id in token_ids:
+            token_type = self.current_token.type
+            self.advance_stream()
+            return token_type
+        return None
+
+
+    def match_id(self, type_id: int) -> bool:
+        if self.current_id == type_id:
+            self.advance_stream()
+            return True
+        return False
+
+
+    def get_current_id(self) -> int:
+        return self.current_id
+
+
+    def get_current_token(self):
+        return self.current_token
+
+
+    def get_previous_token(self):
+        return self.previous_token
+
+
+    def advance(self):
+        if self.is_not_eof():
+            self.advance_stream()
+
+
+    def advance_stream(self):
+        self.previous_token = self.current_token
+        self.current_token = next(self.tokens, None)
+        self.current_id = EOF_ID if self.current_token is None else TOKEN_TYPE_IDS[self.current_token.type]
+
+
+    def is_not_eof(self):
+        return self.current_token is not None
+
+
+class _BufferParser(_Parser):
+    """
+    Parses a `TokenBuffer` by reading its type column directly, so no
+    `Token` objects are built and only literal lexemes are sliced out.
+    """
+    def __init__(self, tokens: TokenBuffer) -> None:
+        self.tokens = tokens
+        self.current = 0
+        self.total_tokens = len(tokens)
+        self.nodes = NodeFactory()
+        self.symbols = SymbolTable()
+        self.constants = ConstantPool()
+        self.diagnostics: List[Diagnostic] | None = None
+        self.error_line = 0
+        self.types = tokens.types.tobytes() + bytes([EOF_ID])
+
+
+    def get_previous_lexeme(self):
+        return self.tokens.get_lexeme(self.current - 1)
+
+
+# Binding power of each binary operator, indexed by token type id; higher
+# binds tighter and 0 means the token is not a binary operator. Every level
+# is left-associative, matching `_Parser.equality` through `_Parser.factor`.
+BINDING_POWERS = [0] * len(TOKEN_TYPES)
+for binding_power, level_ids in enumerate((EQUALITY_IDS, COMPARISON_IDS, TERM_IDS, FACTOR_IDS), start=1):
+    for type_id in level_ids:
+        BINDING_POWERS[type_id] = binding_power
+
+
+# Operator stack markers, ranked below every binary binding power so that
+# reducing binary operators stops at them.
+GROUP_MARKER = 0
+UNARY_MARKER = -1
+
+
+class _PrattParser:
+    """
+    Precedence-climbing parser that builds the same trees as `_Parser`
+    without recursion: open groups and prefix operators wait on an explicit
+    operator stack, so nesting depth is bounded by memory rather than by the
+    interpreter's recursion limit. Tokens are read through `cursor`, so any
+    of the token sources `_Parser` supports can be used.
+    """
+    def __init__(self, cursor: _Parser) -> None:
+        self.cursor = cursor
+
+
+    def parse(self):
+        cursor = self.cursor
+        nodes = cursor.nodes
+        operands = []
+        operators: list[tuple[int, TokenType | None]] = []
+        while True:
+            # Operand position: open any groups and prefix operators, then
+            # read the variable or literal they apply to.
+            while True:
+                type_id = cursor.get_current_id()
+                if type_id in UNARY_IDS:
+                    operators.append((UNARY_MARKER, TOKEN_TYPES[type_id]))
+                elif type_id == PAREN_OPEN_ID:
+                    operators.append((GROUP_MARKER, None))
+                else:
+                    break
+                cursor.advance()
+            atom = cursor.atom()
+            if atom is None:
+                cursor.error_at_operand()
+                atom = nodes.not_implemented()
+            operands.append(atom)
+            # Operator position: an operand has just been completed.
+            while True:
+                while operators and operators[-1][0] == UNARY_MARKER:
+                    operands[-1] = nodes.unary(operators.pop()[1], operands[-1])
+                type_id = cursor.get_current_id()
+                binding_power = BINDING_POWERS[type_id]
+                if binding_power:
+                    self.reduce(nodes, operands, operators, binding_power)
+                    cursor.advance()
+                    operators.append((binding_power, TOKEN_TYPES[type_id]))
+                    break
+                self.reduce(nodes, operands, operators, GROUP_MARKER + 1)
+                if not operators:
+                    return operands.pop()
+                operators.pop()
+                expr = operands.pop()
+                if type_id == PAREN_CLOSE_ID:
+                    cursor.advance()
+                    operands.append(nodes.group(expr))
+                else:
+                    # An unclosed group, as in `_Parser.primary`.
+                    cursor.error("Expected ')' after expression.")
+                    operands.append(nodes.not_implemented())
+
+
+    def reduce(self, nodes: NodeFactory, operands: list, operators: list, binding_power: int):
+        while operators and operators[-1][0] >= binding_power:
+            operator = operators.pop()[1]
+            right = operands.pop()
+            operands[-1] = nodes.binary(operands[-1], operator, right)
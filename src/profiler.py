@@ -0,0 +1,165 @@
+import json
+import time
+import tracemalloc
+from collections import Counter
+from typing import Any, Callable, TypeVar
+from typing_extensions import TypedDict
+from .evaluator import Evaluator
+from .grammar import BinaryExpr, ExprElem, GroupExpr, UnaryExpr
+
+
+T = TypeVar('T')
+
+
+class PhaseRecord(TypedDict):
+    phase: str
+    seconds: float
+    allocated_blocks: int
+    allocated_bytes: int
+    peak_bytes: int
+    items: int | None
+    unit: str | None
+    items_per_second: float | None
+
+
+class PhaseProfiler:
+    """
+    Records wall time, allocations (through `tracemalloc`) and throughput
+    for each pipeline phase run through `measure`. With `count_nodes`, the
+    interpreter also records how many nodes of each type get evaluated.
+    """
+    def __init__(self, trace_allocations: bool = True, count_nodes: bool = False) -> None:
+        self.trace_allocations = trace_allocations
+        self.count_nodes = count_nodes
+        self.phases: list[PhaseRecord] = []
+        self.node_counts: Counter[str] = Counter()
+
+
+    def measure(self, phase: str, run: Callable[[], T], count: Callable[[T], int] | None = None, unit: str | None = None) -> T:
+        """
+        Runs `run` as `phase` and returns its result. `count` gives the number
+        of `unit`s the phase processed, from its result, for throughput.
+        """
+        started_tracing = False
+        before = None
+        if self.trace_allocations:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracing = True
+            before = tracemalloc.take_snapshot()
+            tracemalloc.reset_peak()
+            memory_before = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            result = run()
+        finally:
+            seconds = time.perf_counter() - start
+            record: PhaseRecord = {
+                'phase': phase,
+                'seconds': seconds,
+                'allocated_blocks': 0,
+                'allocated_bytes': 0,
+                'peak_bytes': 0,
+                'items': None,
+                'unit': unit,
+                'items_per_second': None,
+            }
+            if before is not None:
+                current, peak = tracemalloc.get_traced_memory()
+                after = tracemalloc.take_snapshot()
+                record['allocated_bytes'] = current - memory_before
+                record['peak_bytes'] = peak - memory_before
+                record['allocated_blocks'] = sum(stat.count_diff for stat in after.compare_to(before, 'filename'))
+                if started_tracing:
+                    tracemalloc.stop()
+            self.phases.append(record)
+        if count is not None:
+            items = count(result)
+            record['items'] = items
+            record['items_per_second'] = items / seconds if seconds else None
+        return result
+
+
+    def record_node_counts(self, expr: ExprElem, env: dict[str, Any] | None = None):
+        evaluator = _CountingEvaluator(self.node_counts, env)
+        try:
+            evaluator.evaluate(expr)
+        except Exception:
+            # Counts up to the failing node are still worth reporting.
+            pass
+
+
+    def report(self) -> dict[str, Any]:
+        report: dict[str, Any] = {
+            'phases': self.phases,
+            'total_seconds': sum(record['seconds'] for record in self.phases),
+        }
+        if self.count_nodes:
+            report['node_counts'] = dict(self.node_counts)
+        return report
+
+
+    def to_json(self) -> str:
+        return json.dumps(self.report(), indent=2)
+
+
+def measure(profiler: PhaseProfiler | None, phase: str, run: Callable[[], T], count: Callable[[T], int] | None = None, unit: str | None = None) -> T:
+    """
+    Runs `run` through `profiler` when one is given, otherwise just runs it.
+    """
+    if profiler is None:
+        return run()
+    return profiler.measure(phase, run, count, unit)
+
+
+def count_nodes(expr: ExprElem) -> int:
+    count = 0
+    stack = [expr]
+    while stack:
+        node = stack.pop()
+        count += 1
+        match node:
+            case BinaryExpr():
+                stack.append(node.left)
+                stack.append(node.right)
+            case UnaryExpr():
+                stack.append(node.unary)
+            case GroupExpr():
+                stack.append(node.group)
+    return count
+
+
+class _CountingEvaluator(Evaluator):
+    def __init__(self, counts: Counter[str], env: dict[str, Any] | None = None) -> None:
+        super().__init__(env)
+        self.counts = counts
+
+
+    def visit_binary(self, expr):
+        self.counts['BinaryExpr'] += 1
+        return super().visit_binary(expr)
+
+
+    def visit_unary(self, expr):
+        self.counts['UnaryExpr'] += 1
+        return super().visit_unary(expr)
+
+
+    def visit_group(self, expr):
+        self.counts['GroupExpr'] += 1
+        return super().visit_group(expr)
+
+
+    def visit_literal(self, expr):
+        self.counts['LiteralExpr'] += 1
+        return super().visit_literal(expr)
+
+
+    def visit_variable(self, expr):
+        self.counts['VariableExpr'] += 1
+        return super().visit_variable(expr)
+
+
+    def visit_not_implemented_expr(self, expr):
+        self.counts['NotImplementedExpr'] += 1
+        return super().visit_not_implemented_expr(expr)
@@ -0,0 +1,112 @@
+import time
+from collections import OrderedDict
+from typing import Any, Callable
+from .constants import ConstantPool
+from .diagnostics import Diagnostic, LoxSyntaxError
+from .evaluator import Evaluator, LoxRuntimeError
+from .interpreter import Interpreter
+from .parser import Parser
+from .scanner import Scanner
+from .symbols import SymbolTable
+
+
+BACKENDS = ("tree", "closure", "vm", "flat")
+
+
+class Repl:
+    """
+    Interactive loop that runs each line through the same scan, parse and
+    evaluate pipeline as `Interpreter.run_script`. Lines seen before skip
+    straight to evaluation using their cached compiled form. New lines are
+    scanned and parsed against one symbol table and constant pool kept for
+    the whole session, so names and literals already seen are not interned
+    or converted again.
+
+    Commands:
+        :time             toggle per-phase timings
+        :backend [NAME]   show or switch the evaluation backend
+        :quit             leave the REPL (so does end of input)
+    """
+    def __init__(self, backend: str = "tree", cache_size: int = 512) -> None:
+        self.backend = backend
+        self.show_timings = False
+        self.cache_size = cache_size
+        self.compiled: OrderedDict[tuple[str, str], Callable[[], Any]] = OrderedDict()
+        self.symbols = SymbolTable()
+        self.constants = ConstantPool()
+
+
+    def run(self):
+        while True:
+            try:
+                line = input("> ")
+            except (EOFError, KeyboardInterrupt):
+                print()
+                return
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith(":"):
+                if not self.run_command(line):
+                    return
+                continue
+            try:
+                result = self.run_line(line)
+            except Exception as error:
+                print(error)
+                continue
+            print(Evaluator.stringify(result))
+
+
+    def run_command(self, line: str) -> bool:
+        match line.split():
+            case [":quit" | ":q"]:
+                return False
+            case [":time"]:
+                self.show_timings = not self.show_timings
+                print(f"Timings {'on' if self.show_timings else 'off'}.")
+            case [":backend"]:
+                print(self.backend)
+            case [":backend", backend] if backend in BACKENDS:
+                self.backend = backend
+            case _:
+                print(f"Unknown command: {line}")
+        return True
+
+
+    def run_line(self, line: str) -> Any:
+        timings: list[str] = []
+        key = (self.backend, line)
+        compiled = self.compiled.get(key)
+        if compiled is None:
+            start = time.perf_counter()
+            diagnostics: list[Diagnostic] = []
+            tokens = Scanner(line + "\n", diagnostics=diagnostics, symbols=self.symbols).scan_buffer()
+            timings.append(self.format_timing("scan", start))
+            start = time.perf_counter()
+            expr = Parser(tokens, "pratt", diagnostics=diagnostics, symbols=self.symbols, constants=self.constants).parse()
+            if diagnostics:
+                raise LoxSyntaxError(diagnostics)
+            timings.append(self.format_timing("parse", start))
+            start = time.perf_counter()
+            compiled = Interpreter.compile(expr, self.backend)
+            timings.append(self.format_timing("compile", start))
+            self.compiled[key] = compiled
+            if len(self.compiled) > self.cache_size:
+                self.compiled.popitem(last=False)
+        else:
+            self.compiled.move_to_end(key)
+            timings.append("cached")
+        start = time.perf_counter()
+        try:
+            return compiled()
+        except RecursionError:
+            raise LoxRuntimeError("[RUNTIME ERROR] Expression is nested too deeply.")
+        finally:
+            timings.append(self.format_timing("evaluate", start))
+            if self.show_timings:
+                print("  ".join(timings))
+
+
+    def format_timing(self, phase: str, start: float) -> str:
+        return f"{phase} {(time.perf_counter() - start) * 1e3:.3f}ms"
@@ -1,6 +1,15 @@
-from typing import List
+import io
+import mmap
+import os
+import re
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Iterator, List, TextIO
 from typing_extensions import NotRequired, TypedDict
-from .token import TokenType, Token
+from .diagnostics import Diagnostic, LoxSyntaxError
+from .symbols import SymbolTable
+from .token import KEYWORDS, OPERATORS, TOKEN_TYPE_IDS, Token, TokenBuffer, TokenType
 
 
 class AddTokenArgs(TypedDict):
@@ -11,16 +20,105 @@ class AddTokenArgs(TypedDict):
 
 
 class Scanner:
-    def __init__(self, source):
+    """
+    Splits `source` into tokens. Errors raise on the first one found unless a
+    `diagnostics` list is given, in which case each error is appended to it
+    and scanning carries on past the offending characters. Identifier lexemes
+    of `Token` objects are interned into `symbols`, which a parser may share.
+    """
+    def __init__(
+        self,
+        source,
+        engine: str = "default",
+        diagnostics: List[Diagnostic] | None = None,
+        symbols: SymbolTable | None = None
+    ):
         self.source = source
+        self.engine = engine
+        self.diagnostics = diagnostics
+        self.symbols = symbols if symbols is not None else SymbolTable()
 
 
     def scan(self):
-        return _Tokenizer(self.source).tokenize()
+        match self.engine:
+            case "default":
+                return _Tokenizer(self.source, self.diagnostics, self.symbols).tokenize()
+            case "fast":
+                return _FastTokenizer(self.source, self.diagnostics, self.symbols).tokenize()
+            case _:
+                raise Exception(f"Unknown scanner engine: {self.engine}")
+
+
+    def iter_tokens(self, chunk_size: int = 65536) -> Iterator[Token]:
+        """
+        Lazily yields tokens while reading `source` in chunks of `chunk_size`
+        characters. `source` may be a string or a text stream such as an open
+        file. Streaming always uses the "fast" engine.
+        """
+        stream = io.StringIO(self.source) if isinstance(self.source, str) else self.source
+        return _StreamTokenizer(stream, chunk_size, self.diagnostics, self.symbols).iter_tokens()
+
+
+    def iter_spans(self, pos: int = 0, line: int = 1, col_offset: int = 0):
+        """
+        Yields `(type, start, end, line, col_offset)` for each token of a
+        string `source`, starting at `pos` with the scanner on `line` and
+        columns measured from `col_offset`. `pos` must not be inside a token
+        or string literal. Always uses the "fast" engine.
+        """
+        tokenizer = _FastTokenizer(self.source, self.diagnostics)
+        tokenizer.line = line
+        tokenizer.col_offset = col_offset
+        return tokenizer.scan_range(self.source, pos, len(self.source), True)
+
+
+    def scan_buffer(self) -> TokenBuffer:
+        """
+        Scans `source` into a columnar `TokenBuffer` instead of a list of
+        `Token` objects. Always uses the "fast" engine. `source` may also be
+        UTF-8 bytes or a buffer of them such as an `mmap`, which is scanned
+        in place; its lexemes are decoded as they are read from the buffer.
+        """
+        if isinstance(self.source, str):
+            return _FastTokenizer(self.source, self.diagnostics).tokenize_buffer()
+        return _ByteTokenizer(self.source, self.diagnostics).tokenize_buffer()
+
+
+    def scan_parallel(
+        self,
+        workers: int | None = None,
+        min_chunk_size: int = 1 << 20,
+        path: str | None = None
+    ) -> TokenBuffer:
+        """
+        Scans `source` like `scan_buffer`, split into up to `workers` chunks
+        of at least `min_chunk_size` characters that are scanned in a process
+        pool (one process per CPU by default). Falls back to `scan_buffer`
+        when the source is too small to split. When `source` maps the file at
+        `path`, each worker maps the file itself and scans its chunk in
+        place, so no chunk is copied out of the map.
+        """
+        workers = workers or os.cpu_count() or 1
+        parts = min(workers, len(self.source) // min_chunk_size)
+        if parts <= 1:
+            return self.scan_buffer()
+        return _ParallelTokenizer(self.source, self.diagnostics, path).tokenize_buffer(parts, workers)
+
+
+def report(diagnostics: List[Diagnostic] | None, diagnostic: Diagnostic, fatal: bool = True):
+    if diagnostics is not None:
+        diagnostics.append(diagnostic)
+    elif fatal:
+        raise LoxSyntaxError([diagnostic])
+    else:
+        print(diagnostic.message)
+
+
+IDENT_TAIL_REGEX = re.compile(r"[A-Za-z0-9_]*")
 
 
 class _Tokenizer:
-    def __init__(self, source):
+    def __init__(self, source, diagnostics: List[Diagnostic] | None = None, symbols: SymbolTable | None = None):
         self.source: str = source
         self.source_len: int = len(source)
         self.head: int = 0
@@ -28,6 +126,8 @@ class _Tokenizer:
         self.col_offset: int = self.head
         self.line: int = 1
         self.tokens: List[Token] = []
+        self.diagnostics = diagnostics
+        self.symbols = symbols if symbols is not None else SymbolTable()
 
 
     def tokenize(self):
@@ -120,7 +220,9 @@ class _Tokenizer:
             case _ident_or_keyword if char == "_" or self.is_alpha(char):
                 self.get_ident_or_keyword()
             case _:
-                print(f"Unknown symbol: {char}")
+                column = self.head - self.col_offset
+                diagnostic = Diagnostic("UNKNOWN SYMBOL", f"Unknown symbol: {char}", (self.line, self.line), (column, column))
+                report(self.diagnostics, diagnostic, fatal=False)
         self.move_head(1)
         self.move_tail(1)
 
@@ -145,7 +247,12 @@ class _Tokenizer:
                 offset = self.tail
             self.move_tail(1)
         if not self.is_not_eof(index=self.tail):
-            raise Exception(f"[UNTERMINATED STRING] Line: {self.line} Column: {self.head - self.col_offset}")
+            column = self.head - self.col_offset
+            report(self.diagnostics, Diagnostic("UNTERMINATED STRING", "Unterminated string.", (self.line, self.line), (column, column)))
+            # Resume on the line after the opening quote.
+            newline = self.source.find("\n", self.head)
+            self.head = (self.source_len if newline == -1 else newline) - 1
+            self.tail = self.head
         else:
             self.move_tail(1)
             lexeme = self.get_lexeme()
@@ -163,19 +270,20 @@ class _Tokenizer:
 
 
     def get_number_token(self):
-        if self.get_char() == "0" and self.is_digit(self.peek()):
-            self.move_tail(1)
-            raise Exception(f"Invalid number literal. Line: {self.line} Col: {self.get_column()}")
+        valid = not (self.get_char() == "0" and self.is_digit(self.peek()))
         token_type = TokenType.INTEGER
         while self.is_digit(self.get_char(index=self.tail)) or self.get_char(index=self.tail) == ".":
             if self.get_char(index=self.tail) == ".":
                 if self.is_digit(self.peek(index=self.tail)) and token_type == TokenType.INTEGER:
                     token_type = TokenType.FLOAT
                 else:
-                    raise Exception(f"Invalid number literal. Line: {self.line} Col: {self.get_column()}")
+                    valid = False
             self.move_tail(1)
         lexeme = self.get_lexeme()
         self.move_tail(-1)
+        if not valid:
+            diagnostic = Diagnostic("INVALID NUMBER", "Invalid number literal.", (self.line, self.line), self.get_column())
+            report(self.diagnostics, diagnostic)
         self.add_token({ 'type': token_type, 'lexeme': lexeme })
         self.head = self.tail
 
@@ -183,53 +291,14 @@ class _Tokenizer:
     def get_ident_or_keyword(self):
         if self.get_char() == "_" and self.is_digit(self.peek()):
             self.move_tail(1)
-            raise Exception(f"Invalid identifier. Line: {self.line} Col: {self.get_column()}")
-        while self.is_alphanum(self.get_char(index=self.tail)):
-            self.move_tail(1)
+            diagnostic = Diagnostic("INVALID IDENTIFIER", "Invalid identifier.", (self.line, self.line), self.get_column())
+            report(self.diagnostics, diagnostic)
+        self.tail = IDENT_TAIL_REGEX.match(self.source, self.tail).end()
         lexeme = self.get_lexeme()
         self.move_tail(-1)
-        token_type = None
-        match lexeme:
-            case "nil":
-                token_type = TokenType.NIL
-            case "true":
-                token_type = TokenType.TRUE
-            case "false":
-                token_type = TokenType.FALSE
-            case "not":
-                token_type = TokenType.NOT
-            case "is":
-                token_type = TokenType.IS
-            case "in":
-                token_type = TokenType.IN
-            case "and":
-                token_type = TokenType.AND
-            case "or":
-                token_type = TokenType.OR
-            case "let":
-                token_type = TokenType.LET
-            case "const":
-                token_type = TokenType.CONST
-            case "if":
-                token_type = TokenType.IF
-            case "elif":
-                token_type = TokenType.ELIF
-            case "else":
-                token_type = TokenType.ELSE
-            case "for":
-                token_type = TokenType.FOR
-            case "while":
-                token_type = TokenType.WHILE
-            case "fun":
-                token_type = TokenType.FUN
-            case "switch":
-                token_type = TokenType.SWITCH
-            case "case":
-                token_type = TokenType.CASE
-            case "return":
-                token_type = TokenType.RETURN
-            case _:
-                token_type = TokenType.IDENT
+        token_type = KEYWORDS.get(lexeme, TokenType.IDENT)
+        if token_type is TokenType.IDENT:
+            lexeme = self.symbols.intern(lexeme)
         self.add_token({'type': token_type, 'lexeme': lexeme})
         self.head = self.tail
 
@@ -271,10 +340,6 @@ class _Tokenizer:
         return (char >= 'a' and char <= 'z') or (char >= 'A' and char <= 'Z')
 
 
-    def is_alphanum(self, char):
-        return self.is_digit(char) or self.is_alpha(char)
-
-
     def move_head(self, amount):
         self.head = self.head + amount
 
@@ -286,3 +351,348 @@ class _Tokenizer:
     def move_line(self, amount):
         self.line = self.line + amount
         self.col_offset = self.head
+
+
+# Alternatives are ordered so that two-character operators win over their
+# one-character prefixes, mirroring the `peek()` checks of `_Tokenizer`, and
+# malformed identifiers and numbers are matched whole before the valid forms.
+# The atomic group keeps `1.5` from matching as `1` followed by a stray dot.
+TOKEN_PATTERN = (
+    r"(?P<SPACE> +)"
+    r"|(?P<NEWLINE>\n)"
+    r"|(?P<BAD_IDENT>_[0-9][A-Za-z0-9_]*)"
+    r"|(?P<IDENT>[A-Za-z_][A-Za-z0-9_]*)"
+    r"|(?P<BAD_NUMBER>0[0-9][0-9.]*|(?>[0-9]+(?:\.[0-9]+)?)\.[0-9.]*)"
+    r"|(?P<FLOAT>[0-9]+\.[0-9]+)"
+    r"|(?P<INTEGER>[0-9]+)"
+    r"|(?P<OPERATOR>\*\*|//|\+=|-=|==|>=|<=|[.,&|;(){}\[\]+\-*/=<>])"
+    r"|(?P<STRING>\"[^\"]*\"|'[^']*')"
+    r"|(?P<COMMENT>#[^\n]*)"
+    r"|(?P<QUOTE>['\"])"
+)
+TOKEN_REGEX = re.compile(TOKEN_PATTERN + r"|(?P<UNKNOWN>.)", re.DOTALL)
+# Over UTF-8 bytes an unknown character is a lead byte and its continuation
+# bytes, so it is reported once.
+BYTE_TOKEN_REGEX = re.compile((TOKEN_PATTERN + r"|(?P<UNKNOWN>[\xc0-\xff][\x80-\xbf]*|.)").encode(), re.DOTALL)
+
+
+# A malformed number is scanned as a float when `_Tokenizer` would have
+# seen a dot followed by a digit in it.
+FLOAT_REGEX = re.compile(r"\.[0-9]")
+BYTE_FLOAT_REGEX = re.compile(rb"\.[0-9]")
+
+
+class _FastTokenizer:
+    """
+    Produces the same token stream as `_Tokenizer` using a single pass of
+    `TOKEN_REGEX` instead of per-character dispatch.
+    """
+    regex = TOKEN_REGEX
+    float_regex = FLOAT_REGEX
+    operators = OPERATORS
+    keywords = KEYWORDS
+    newline = "\n"
+
+    def __init__(self, source, diagnostics: List[Diagnostic] | None = None, symbols: SymbolTable | None = None):
+        self.source = source
+        self.line: int = 1
+        self.col_offset: int = 0
+        self.pos: int = 0
+        self.diagnostics = diagnostics
+        self.symbols = symbols if symbols is not None else SymbolTable()
+
+
+    def tokenize(self):
+        return list(self.iter_tokens(self.source, 0, len(self.source), True))
+
+
+    def tokenize_buffer(self):
+        buffer = TokenBuffer(self.source)
+        append = buffer.append
+        for token_type, start, end, line, _ in self.scan_range(self.source, 0, len(self.source), True):
+            append(TOKEN_TYPE_IDS[token_type], start, end, line)
+        return buffer
+
+
+    def iter_tokens(self, source: str, pos: int, endpos: int, final: bool) -> Iterator[Token]:
+        intern = self.symbols.intern
+        for token_type, start, end, line, col_offset in self.scan_range(source, pos, endpos, final):
+            token = Token.from_source(source, token_type, start, end, line, col_offset)
+            if token_type is TokenType.IDENT:
+                token.lexeme = intern(token.lexeme)
+            yield token
+
+
+    def scan_range(self, source, pos: int, endpos: int, final: bool):
+        """
+        Yields `(type, start, end, line, col_offset)` for every token of
+        `source[pos:endpos]`. When `final` is false, a string literal that is
+        not closed before `endpos`, or a comment reaching it, stops the scan
+        so it can be resumed from `self.pos` once more input is available.
+        """
+        line = self.line
+        col_offset = self.col_offset
+        diagnostics = self.diagnostics
+        operators = self.operators
+        keywords = self.keywords
+        newline = self.newline
+        while True:
+            # Recovering from an unterminated string skips input, which
+            # restarts the scan from `pos`.
+            for found in self.regex.finditer(source, pos, endpos):
+                kind = found.lastgroup
+                start, end = found.span()
+                match kind:
+                    case "SPACE":
+                        continue
+                    case "COMMENT":
+                        if end == endpos and not final:
+                            # The comment may carry on past `endpos`.
+                            self.line, self.col_offset, self.pos = line, col_offset, start
+                            return
+                        continue
+                    case "NEWLINE":
+                        line += 1
+                        col_offset = start
+                        continue
+                    case "OPERATOR":
+                        yield (operators[found.group()], start, end, line, col_offset)
+                    case "IDENT":
+                        yield (keywords.get(found.group(), TokenType.IDENT), start, end, line, col_offset)
+                    case "INTEGER":
+                        yield (TokenType.INTEGER, start, end, line, col_offset)
+                    case "FLOAT":
+                        yield (TokenType.FLOAT, start, end, line, col_offset)
+                    case "STRING":
+                        yield (TokenType.STRING, start, end, line, col_offset)
+                        text = found.group()
+                        newlines = text.count(newline)
+                        if newlines:
+                            line += newlines
+                            col_offset = start + text.rfind(newline)
+                    case "BAD_IDENT":
+                        col = start - col_offset
+                        report(diagnostics, Diagnostic("INVALID IDENTIFIER", "Invalid identifier.", (line, line), (col, col + 1)))
+                        yield (TokenType.IDENT, start, end, line, col_offset)
+                    case "BAD_NUMBER":
+                        col = (start - col_offset, end - 1 - col_offset)
+                        report(diagnostics, Diagnostic("INVALID NUMBER", "Invalid number literal.", (line, line), col))
+                        token_type = TokenType.FLOAT if self.float_regex.search(found.group()) else TokenType.INTEGER
+                        yield (token_type, start, end, line, col_offset)
+                    case "QUOTE":
+                        if not final:
+                            self.line, self.col_offset, self.pos = line, col_offset, start
+                            return
+                        col = start - col_offset
+                        report(diagnostics, Diagnostic("UNTERMINATED STRING", "Unterminated string.", (line, line), (col, col)))
+                        # Resume on the line after the opening quote.
+                        next_newline = source.find(newline, start, endpos)
+                        pos = endpos if next_newline == -1 else next_newline
+                        break
+                    case "UNKNOWN":
+                        col = start - col_offset
+                        char = self.decode(found.group())
+                        diagnostic = Diagnostic("UNKNOWN SYMBOL", f"Unknown symbol: {char}", (line, line), (col, col))
+                        report(diagnostics, diagnostic, fatal=False)
+            else:
+                break
+        self.line, self.col_offset, self.pos = line, col_offset, endpos
+
+
+    def decode(self, text) -> str:
+        return text
+
+
+# Lookup tables of `_FastTokenizer` keyed by UTF-8 bytes.
+BYTE_OPERATORS = { operator.encode(): token_type for operator, token_type in OPERATORS.items() }
+BYTE_KEYWORDS = { keyword.encode(): token_type for keyword, token_type in KEYWORDS.items() }
+
+
+class _ByteTokenizer(_FastTokenizer):
+    """
+    Scans UTF-8 encoded bytes, or any buffer holding them such as an `mmap`,
+    without decoding them. Offsets, and so columns, count bytes.
+    """
+    regex = BYTE_TOKEN_REGEX
+    float_regex = BYTE_FLOAT_REGEX
+    operators = BYTE_OPERATORS
+    keywords = BYTE_KEYWORDS
+    newline = b"\n"
+
+    def decode(self, text) -> str:
+        return text.decode("utf-8", "replace")
+
+
+# Comments, string literals and unterminated quotes, whose line the scanner
+# skips. Matching them in order, as the scanner would, finds every string
+# literal without tokenizing anything else.
+QUOTED_PATTERN = r"#[^\n]*|\"[^\"]*\"|'[^']*'|[\"'][^\n]*"
+QUOTED_REGEX = re.compile(QUOTED_PATTERN)
+BYTE_QUOTED_REGEX = re.compile(QUOTED_PATTERN.encode())
+
+
+# Bytes of a mapped source copied at a time to count its newlines.
+NEWLINE_WINDOW = 1 << 20
+
+
+class _ParallelTokenizer:
+    """
+    Splits a source into chunks at newlines outside string literals, scans
+    the chunks in separate processes and concatenates their tokens. Each
+    chunk starts on a new line and is scanned with the line number and
+    offset it has in the whole source, so its tokens and diagnostics need no
+    correcting afterwards. A source mapped from the file at `path` is not
+    sent to the workers at all; they are given the bounds of their chunk.
+    """
+    def __init__(self, source, diagnostics: List[Diagnostic] | None = None, path: str | None = None):
+        self.source = source
+        self.diagnostics = diagnostics
+        self.path = path
+        self.newline = "\n" if isinstance(source, str) else b"\n"
+
+
+    def tokenize_buffer(self, parts: int, workers: int) -> TokenBuffer:
+        source = self.source
+        bounds = self.split(parts)
+        starts = bounds[:-1]
+        ends = bounds[1:]
+        lines = [1]
+        for start, end in zip(starts, bounds[1:-1]):
+            lines.append(lines[-1] + self.count_newlines(start, end))
+        buffer = TokenBuffer(source)
+        with ProcessPoolExecutor(max_workers=min(workers, len(starts))) as executor:
+            if self.path is None:
+                chunks = (source[start:end] for start, end in zip(starts, ends))
+                results = executor.map(scan_chunk, chunks, starts, lines)
+            else:
+                results = executor.map(scan_file_chunk, repeat(self.path), starts, ends, lines)
+            for types, token_starts, token_ends, token_lines, diagnostics in results:
+                buffer.types.extend(types)
+                buffer.starts.extend(token_starts)
+                buffer.ends.extend(token_ends)
+                buffer.lines.extend(token_lines)
+                for diagnostic in diagnostics:
+                    report(self.diagnostics, diagnostic, fatal=diagnostic.kind != "UNKNOWN SYMBOL")
+        return buffer
+
+
+    def count_newlines(self, start: int, end: int) -> int:
+        source = self.source
+        if not isinstance(source, mmap.mmap):
+            return source.count(self.newline, start, end)
+        # An `mmap` cannot count, and copying it out whole would defeat
+        # mapping it, so it is counted a window at a time.
+        return sum(
+            source[pos:min(pos + NEWLINE_WINDOW, end)].count(self.newline)
+            for pos in range(start, end, NEWLINE_WINDOW)
+        )
+
+
+    def split(self, parts: int) -> List[int]:
+        """
+        Returns the offsets of `parts + 1` chunk boundaries, or fewer when
+        string literals leave no newline near a target boundary. Every inner
+        boundary follows a newline that is not inside a string literal.
+        """
+        source = self.source
+        newline = self.newline
+        size = len(source)
+        regex = QUOTED_REGEX if isinstance(source, str) else BYTE_QUOTED_REGEX
+        # Only string literals can span lines.
+        spans = [found.span() for found in regex.finditer(source) if source.find(newline, *found.span()) != -1]
+        bounds = [0]
+        span_index = 0
+        for part in range(1, parts):
+            pos = source.find(newline, max(size * part // parts, bounds[-1]))
+            while pos != -1:
+                while span_index < len(spans) and spans[span_index][1] <= pos:
+                    span_index += 1
+                if span_index == len(spans) or spans[span_index][0] > pos:
+                    break
+                pos = source.find(newline, spans[span_index][1])
+            if pos == -1 or pos + 1 >= size:
+                break
+            bounds.append(pos + 1)
+        bounds.append(size)
+        return bounds
+
+
+def scan_chunk(chunk, base: int, line: int) -> tuple[array, array, array, array, List[Diagnostic]]:
+    """
+    Scans a chunk of a larger source that starts at offset `base` on `line`,
+    in a worker process of `_ParallelTokenizer`. Returns the token columns
+    and diagnostics in the coordinates of the whole source.
+    """
+    return scan_part(chunk, 0, len(chunk), base, line)
+
+
+def scan_file_chunk(path: str, pos: int, endpos: int, line: int) -> tuple[array, array, array, array, List[Diagnostic]]:
+    """
+    Like `scan_chunk` for the chunk `[pos, endpos)` of the file at `path`,
+    which is mapped and scanned in place.
+    """
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as source:
+        return scan_part(source, pos, endpos, 0, line)
+
+
+def scan_part(source, pos: int, endpos: int, base: int, line: int) -> tuple[array, array, array, array, List[Diagnostic]]:
+    """
+    Scans `source[pos:endpos]` starting on `line`, where `source` begins at
+    offset `base` of the whole source and `pos` is at the start of a line.
+    """
+    diagnostics: List[Diagnostic] = []
+    tokenizer = (_FastTokenizer if isinstance(source, str) else _ByteTokenizer)(source, diagnostics)
+    tokenizer.line = line
+    # Columns are measured from the newline before the chunk, as they would
+    # be in the whole source, except on the first line.
+    tokenizer.col_offset = 0 if base + pos == 0 else pos - 1
+    types, starts, ends, lines = array('B'), array('q'), array('q'), array('i')
+    for token_type, start, end, token_line, _ in tokenizer.scan_range(source, pos, endpos, True):
+        types.append(TOKEN_TYPE_IDS[token_type])
+        starts.append(base + start)
+        ends.append(base + end)
+        lines.append(token_line)
+    return types, starts, ends, lines, diagnostics
+
+
+# Characters that never continue a token before or after them, so the scan
+# of a chunk may stop right after one. `scan_range` holds back the string
+# literals and comments that such a stop can cut off.
+STREAM_BOUNDARIES = (" ", "\n", "(", ")", "{", "}", "[", "]", ",", ";", "&", "|")
+
+
+class _StreamTokenizer:
+    """
+    Feeds a text stream through `_FastTokenizer` one chunk at a time. Only
+    the unscanned tail of the input (the token cut off by the end of the
+    chunk, a string literal or a comment) is kept in memory between chunks,
+    even for a script written on a single line.
+    """
+    def __init__(
+        self,
+        stream: TextIO,
+        chunk_size: int,
+        diagnostics: List[Diagnostic] | None = None,
+        symbols: SymbolTable | None = None
+    ):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.diagnostics = diagnostics
+        self.symbols = symbols
+
+
+    def iter_tokens(self):
+        tokenizer = _FastTokenizer("", self.diagnostics, self.symbols)
+        buffer = ""
+        while True:
+            chunk = self.stream.read(self.chunk_size)
+            buffer += chunk
+            final = not chunk
+            endpos = len(buffer) if final else max(map(buffer.rfind, STREAM_BOUNDARIES)) + 1
+            if endpos == 0 and not final:
+                continue
+            yield from tokenizer.iter_tokens(buffer, 0, endpos, final)
+            if final:
+                return
+            buffer = buffer[tokenizer.pos:]
+            tokenizer.col_offset -= tokenizer.pos
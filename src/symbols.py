@@ -0,0 +1,32 @@
+import sys
+from typing import Iterator
+
+
+class SymbolTable:
+    """
+    Interns identifier names with `sys.intern`, so every occurrence of a name
+    in tokens, trees and evaluation environments is one string object and
+    lookups on it succeed on identity. A scanner and a parser given the same
+    table share their symbols.
+    """
+    def __init__(self) -> None:
+        self.symbols: dict[str, str] = {}
+
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.symbols
+
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.symbols)
+
+
+    def intern(self, name: str) -> str:
+        symbol = self.symbols.get(name)
+        if symbol is None:
+            symbol = self.symbols[name] = sys.intern(name)
+        return symbol
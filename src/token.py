@@ -1,5 +1,6 @@
+from array import array
 from enum import Enum
-from typing import TypedDict
+from typing import Iterator, TypedDict
 
 
 class TokenType(Enum):
@@ -62,6 +63,10 @@ class TokenType(Enum):
     CASE = 'CASE'
     RETURN = 'RETURN'
 
+    # Never produced by the scanner; parsers use it as an end-of-input
+    # sentinel so lookahead needs no bounds checks.
+    EOF = 'EOF'
+
 
 class TokenArgs(TypedDict):
     type: TokenType
@@ -71,6 +76,8 @@ class TokenArgs(TypedDict):
 
 
 class Token:
+    __slots__ = ('type', 'lexeme', 'col', 'row')
+
     def __init__(self, token: TokenArgs) -> None:
         self.type = token.get('type')
         self.lexeme = token.get('lexeme')
@@ -80,3 +87,166 @@ class Token:
 
     def __repr__(self) -> str:
         return f"<Token(type={self.type}, lexeme={self.lexeme}, col={self.col}, row={self.row})>"
+
+
+    @staticmethod
+    def from_source(source: str | bytes, token_type: TokenType, start: int, end: int, line: int, col_offset: int) -> 'Token':
+        """
+        Builds the token spanning `source[start:end]` on `line`, where
+        `col_offset` is the index columns on that line are measured from.
+        `source` may be UTF-8 bytes, whose lexemes are decoded.
+        """
+        lexeme = None if token_type in OPERATOR_TYPES else source[start:end]
+        row = (line, line)
+        col = (start - col_offset, end - 1 - col_offset)
+        if type(lexeme) is bytes:
+            newline = lexeme.rfind(b"\n") if token_type is TokenType.STRING else -1
+            lexeme = lexeme.decode("utf-8")
+        elif token_type is TokenType.STRING:
+            newline = lexeme.rfind("\n")
+        else:
+            newline = -1
+        if newline != -1:
+            row = (line, line + lexeme.count("\n"))
+            col = (col[0], end - 1 - (start + newline))
+        return Token({ 'type': token_type, 'lexeme': lexeme, 'col': col, 'row': row })
+
+
+KEYWORDS = {
+    "nil": TokenType.NIL,
+    "true": TokenType.TRUE,
+    "false": TokenType.FALSE,
+    "not": TokenType.NOT,
+    "is": TokenType.IS,
+    "in": TokenType.IN,
+    "and": TokenType.AND,
+    "or": TokenType.OR,
+    "let": TokenType.LET,
+    "const": TokenType.CONST,
+    "if": TokenType.IF,
+    "elif": TokenType.ELIF,
+    "else": TokenType.ELSE,
+    "for": TokenType.FOR,
+    "while": TokenType.WHILE,
+    "fun": TokenType.FUN,
+    "switch": TokenType.SWITCH,
+    "case": TokenType.CASE,
+    "return": TokenType.RETURN,
+}
+
+
+OPERATORS = {
+    ".": TokenType.DOT,
+    ",": TokenType.COMMA,
+    "&": TokenType.AMPERSAND,
+    "|": TokenType.PIPE,
+    ";": TokenType.SEMICOLON,
+    "(": TokenType.PAREN_OPEN,
+    ")": TokenType.PAREN_CLOSE,
+    "{": TokenType.BRACKET_OPEN,
+    "}": TokenType.BRACKET_CLOSE,
+    "[": TokenType.S_BRACKET_OPEN,
+    "]": TokenType.S_BRACKET_CLOSE,
+    "+": TokenType.PLUS,
+    "-": TokenType.MINUS,
+    "*": TokenType.STAR,
+    "/": TokenType.SLASH,
+    "=": TokenType.EQUAL,
+    ">": TokenType.GT,
+    "<": TokenType.LT,
+    "+=": TokenType.PLUS_EQUAL,
+    "-=": TokenType.MINUS_EQUAL,
+    "**": TokenType.STAR_STAR,
+    "//": TokenType.SLASH_SLASH,
+    "==": TokenType.EQUAL_EQUAL,
+    ">=": TokenType.GT_EQUAL,
+    "<=": TokenType.LT_EQUAL,
+}
+
+
+OPERATOR_TYPES = frozenset(OPERATORS.values())
+
+
+TOKEN_TYPES = list(TokenType)
+
+
+TOKEN_TYPE_IDS = { token_type: index for index, token_type in enumerate(TOKEN_TYPES) }
+
+
+EOF_ID = TOKEN_TYPE_IDS[TokenType.EOF]
+
+
+class TokenBuffer:
+    """
+    Columnar token storage holding one typed array per field instead of one
+    object per token. Lexemes, columns and `Token` objects are only sliced out
+    of `source` on request. `source` may be UTF-8 bytes or a buffer of them,
+    such as an `mmap`, in which case offsets count bytes and lexemes are
+    decoded as they are sliced.
+    """
+    def __init__(self, source: str) -> None:
+        self.source = source
+        self.types = array('B')
+        self.starts = array('q')
+        self.ends = array('q')
+        self.lines = array('i')
+        self.line_offsets: array | None = None
+
+
+    def append(self, type_id: int, start: int, end: int, line: int):
+        self.types.append(type_id)
+        self.starts.append(start)
+        self.ends.append(end)
+        self.lines.append(line)
+
+
+    def __len__(self) -> int:
+        return len(self.types)
+
+
+    def __getitem__(self, index: int) -> Token:
+        line = self.lines[index]
+        return Token.from_source(
+            self.source,
+            TOKEN_TYPES[self.types[index]],
+            self.starts[index],
+            self.ends[index],
+            line,
+            self.get_line_offset(line)
+        )
+
+
+    def __iter__(self) -> Iterator[Token]:
+        for index in range(len(self.types)):
+            yield self[index]
+
+
+    def get_type(self, index: int) -> TokenType:
+        return TOKEN_TYPES[self.types[index]]
+
+
+    def get_lexeme(self, index: int) -> str | None:
+        if TOKEN_TYPES[self.types[index]] in OPERATOR_TYPES:
+            return None
+        lexeme = self.source[self.starts[index]:self.ends[index]]
+        return lexeme if type(lexeme) is str else lexeme.decode("utf-8")
+
+
+    def get_line_offset(self, line: int) -> int:
+        """
+        Returns the index columns on `line` are measured from: 0 on the first
+        line, otherwise the index of the newline that ends the previous line.
+        """
+        if self.line_offsets is None:
+            self.line_offsets = self.scan_line_offsets()
+        return self.line_offsets[line - 1]
+
+
+    def scan_line_offsets(self) -> array:
+        offsets = array('q', [0])
+        newline = "\n" if isinstance(self.source, str) else b"\n"
+        index = self.source.find(newline)
+        while index != -1:
+            offsets.append(index)
+            index = self.source.find(newline, index + 1)
+        return offsets
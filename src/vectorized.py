@@ -0,0 +1,285 @@
+from typing import Any, Callable
+from .evaluator import BINARY_OPERATIONS, UNARY_OPERATIONS, Evaluator, LoxRuntimeError, lookup
+from .grammar import BinaryExpr, Expr, ExprElem, GroupExpr, LiteralExpr, NotImplementedExpr, UnaryExpr, VariableExpr
+from .token import TokenType
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# Integer results are computed in int64, which wraps where Lox integers keep
+# growing; results whose float estimate reaches this bound are recomputed a
+# row at a time instead.
+INT_BOUND = 2.0 ** 62
+# Above this magnitude an int64 loses precision on its way to float64, so
+# true division would not round like Python's.
+EXACT_FLOAT_INT = 2 ** 53
+
+ARITHMETIC_OPERATORS = frozenset({
+    TokenType.PLUS,
+    TokenType.MINUS,
+    TokenType.STAR,
+    TokenType.SLASH,
+    TokenType.STAR_STAR,
+    TokenType.SLASH_SLASH,
+})
+COMPARISON_OPERATORS = frozenset({TokenType.GT, TokenType.LT, TokenType.GT_EQUAL, TokenType.LT_EQUAL})
+
+# Array kinds the vectorized operations understand, by NumPy `dtype.kind`:
+# booleans, integers, floats and strings. Anything else is evaluated a row
+# at a time.
+NUMERIC_KINDS = frozenset("if")
+EQUALITY_KINDS = frozenset("bifU")
+
+# A value is either a column of one value per row or a Python scalar that
+# every row shares, as produced by literals and scalar-only subtrees.
+Value = Any
+
+
+class VectorEvaluator:
+    @staticmethod
+    def evaluate(expr: ExprElem, columns: dict[str, Any]) -> Any:
+        """
+        Evaluates `expr` once for every row of `columns`, a dict of equally
+        long NumPy arrays (or sequences) bound to variable names, and returns
+        the column of results. Each binary and unary node is one whole-array
+        operation where NumPy matches Lox's semantics; other nodes, such as
+        string concatenation, a possible division by zero or integer
+        overflow, are evaluated a row at a time.
+
+        Nodes are evaluated for all rows before the next node, so the error
+        hit first may come from a later row than the one that fails first.
+        On a runtime error the rows are evaluated again one by one, so the
+        error raised is the one the first failing row gives. Both passes walk
+        the tree recursively, so a tree nested too deeply for the stack raises
+        a `LoxRuntimeError` like the tree backend does.
+        """
+        if np is None:
+            raise ImportError("Vectorized evaluation requires NumPy.")
+        evaluator = _VectorEvaluator(columns)
+        try:
+            try:
+                return evaluator.broadcast(expr.accept(evaluator))
+            except LoxRuntimeError:
+                evaluator.evaluate_rows(expr)
+                raise
+        except RecursionError:
+            raise LoxRuntimeError("[RUNTIME ERROR] Expression is nested too deeply.")
+
+
+class _VectorEvaluator(Expr):
+    def __init__(self, columns: dict[str, Any]) -> None:
+        self.columns = { name: self.as_column(values) for name, values in columns.items() }
+        lengths = { len(column) for column in self.columns.values() }
+        if len(lengths) != 1:
+            raise Exception("Vectorized evaluation needs at least one column and columns of equal length.")
+        self.rows = lengths.pop()
+
+
+    def evaluate_rows(self, expr: ExprElem):
+        """
+        Evaluates `expr` with `Evaluator` one row at a time, stopping at the
+        first row that raises.
+        """
+        env: dict[str, Any] = {}
+        evaluator = Evaluator(env)
+        rows = [column.tolist() for column in self.columns.values()]
+        for values in zip(*rows):
+            env.update(zip(self.columns, values))
+            evaluator.evaluate(expr)
+
+
+    def visit_binary(self, expr: BinaryExpr) -> Value:
+        left = expr.left.accept(self)
+        right = expr.right.accept(self)
+        operation = BINARY_OPERATIONS[expr.operator]
+        if not isinstance(left, np.ndarray) and not isinstance(right, np.ndarray):
+            return operation(left, right)
+        result = self.vector_binary(expr.operator, left, right)
+        if result is None:
+            return self.scalar_map(operation, left, right)
+        return result
+
+
+    def visit_unary(self, expr: UnaryExpr) -> Value:
+        unary = expr.unary.accept(self)
+        operation = UNARY_OPERATIONS[expr.symbol]
+        if not isinstance(unary, np.ndarray):
+            return operation(unary)
+        result = self.vector_unary(expr.symbol, unary)
+        if result is None:
+            return self.scalar_map(operation, unary)
+        return result
+
+
+    def visit_group(self, expr: GroupExpr) -> Value:
+        return expr.group.accept(self)
+
+
+    def visit_literal(self, expr: LiteralExpr) -> Value:
+        return expr.value
+
+
+    def visit_variable(self, expr: VariableExpr) -> Value:
+        return lookup(self.columns, expr.name)
+
+
+    def visit_not_implemented_expr(self, expr: NotImplementedExpr) -> Value:
+        raise LoxRuntimeError("[RUNTIME ERROR] Expression is not supported.")
+
+
+    def vector_binary(self, operator: TokenType, left: Value, right: Value) -> Value | None:
+        """
+        Applies `operator` to whole columns, or returns None when NumPy's
+        result could differ from evaluating each row.
+        """
+        left_kind = self.kind(left)
+        right_kind = self.kind(right)
+        if operator in ARITHMETIC_OPERATORS or operator in COMPARISON_OPERATORS:
+            if left_kind not in NUMERIC_KINDS or right_kind not in NUMERIC_KINDS:
+                return None
+        match operator:
+            case TokenType.PLUS:
+                return self.checked(np.add, left, right)
+            case TokenType.MINUS:
+                return self.checked(np.subtract, left, right)
+            case TokenType.STAR:
+                return self.checked(np.multiply, left, right)
+            case TokenType.SLASH:
+                if (left_kind == "i" and not self.is_exact(left)) or (right_kind == "i" and not self.is_exact(right)):
+                    return None
+                return self.checked(np.true_divide, left, right)
+            case TokenType.SLASH_SLASH:
+                return self.checked(np.floor_divide, left, right)
+            case TokenType.STAR_STAR:
+                # A negative integer exponent makes a float in Lox but is an
+                # error in NumPy.
+                if left_kind == "i" and right_kind == "i" and np.any(np.less(right, 0)):
+                    return None
+                return self.checked(np.power, left, right)
+            case TokenType.GT:
+                return np.greater(left, right)
+            case TokenType.LT:
+                return np.less(left, right)
+            case TokenType.GT_EQUAL:
+                return np.greater_equal(left, right)
+            case TokenType.LT_EQUAL:
+                return np.less_equal(left, right)
+            case TokenType.EQUAL_EQUAL | TokenType.BANG_EQUAL | TokenType.IS:
+                equal = self.vector_equal(operator, left_kind, right_kind, left, right)
+                if equal is None or operator != TokenType.BANG_EQUAL:
+                    return equal
+                return np.logical_not(equal)
+        return None
+
+
+    def vector_equal(self, operator: TokenType, left_kind: str, right_kind: str, left: Value, right: Value) -> Value | None:
+        if left_kind not in EQUALITY_KINDS or right_kind not in EQUALITY_KINDS:
+            return None
+        if operator == TokenType.IS:
+            # `is` also compares types, so `1 is 1.0` is false.
+            comparable = left_kind == right_kind
+        else:
+            # Booleans never equal numbers in Lox.
+            comparable = (left_kind == "b") == (right_kind == "b") and (left_kind == "U") == (right_kind == "U")
+        if not comparable:
+            return np.zeros(self.rows, dtype=bool)
+        return np.equal(left, right)
+
+
+    def vector_unary(self, symbol: TokenType, unary: Any) -> Value | None:
+        kind = unary.dtype.kind
+        match symbol:
+            case TokenType.MINUS if kind in NUMERIC_KINDS:
+                return self.checked(np.negative, unary)
+            case TokenType.NOT if kind == "b":
+                return np.logical_not(unary)
+            case TokenType.NOT if kind in NUMERIC_KINDS or kind == "U":
+                # Every number and string is truthy.
+                return np.zeros(self.rows, dtype=bool)
+        return None
+
+
+    def checked(self, operation: Callable[..., Any], *operands: Value) -> Value | None:
+        """
+        Runs a NumPy arithmetic `operation`, returning None where Lox would
+        raise or produce a value NumPy cannot: division by zero, float
+        overflow, a complex power or an integer too large for int64.
+        """
+        try:
+            with np.errstate(all="raise"):
+                result = operation(*operands)
+                if result.dtype.kind == "i":
+                    estimate = operation(*(np.asarray(operand, dtype=np.float64) for operand in operands))
+                    if np.any(np.abs(estimate) >= INT_BOUND):
+                        return None
+        except (FloatingPointError, OverflowError, ZeroDivisionError):
+            return None
+        return result
+
+
+    def scalar_map(self, operation: Callable[..., Any], *operands: Value) -> Any:
+        """
+        Applies a scalar Lox `operation` to every row, as a row-at-a-time
+        evaluation would.
+        """
+        rows = [operand.tolist() if isinstance(operand, np.ndarray) else [operand] * self.rows for operand in operands]
+        return self.as_column([operation(*values) for values in zip(*rows)])
+
+
+    def broadcast(self, value: Value) -> Any:
+        if isinstance(value, np.ndarray):
+            return value
+        return self.as_column([value] * self.rows)
+
+
+    def kind(self, value: Value) -> str:
+        if isinstance(value, np.ndarray):
+            return value.dtype.kind
+        match value:
+            case bool():
+                return "b"
+            case int() if -INT_BOUND < value < INT_BOUND:
+                return "i"
+            case float():
+                return "f"
+            case str():
+                return "U"
+        return "O"
+
+
+    def is_exact(self, value: Value) -> bool:
+        return bool(np.all(np.abs(value) <= EXACT_FLOAT_INT))
+
+
+    @staticmethod
+    def as_column(values: Any) -> Any:
+        """
+        Converts `values` to a column whose element type is one Lox type:
+        int64 integers, float64 floats, booleans or strings. Columns mixing
+        types, or holding nil, are kept as Python objects.
+        """
+        if isinstance(values, np.ndarray):
+            match values.dtype.kind:
+                case "b" | "U" | "O":
+                    return values
+                case "i" | "u" if values.size == 0 or -INT_BOUND < values.min() and values.max() < INT_BOUND:
+                    return values.astype(np.int64, copy=False)
+                case "f":
+                    return values.astype(np.float64, copy=False)
+            values = values.tolist()
+        values = list(values)
+        types = set(map(type, values))
+        if types == {int} and all(-INT_BOUND < value < INT_BOUND for value in values):
+            return np.array(values, dtype=np.int64)
+        if types == {float}:
+            return np.array(values, dtype=np.float64)
+        if types == {bool}:
+            return np.array(values, dtype=bool)
+        if types == {str}:
+            return np.array(values, dtype=str)
+        column = np.empty(len(values), dtype=object)
+        column[:] = values
+        return column
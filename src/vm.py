@@ -0,0 +1,116 @@
+from typing import Any
+from .bytecode import Chunk, OpCode
+from .evaluator import BINARY_OPERATIONS, UNARY_OPERATIONS, LoxRuntimeError, lookup
+from .token import TokenType
+
+
+# Binary operation for each opcode value, or None for the other opcodes, so
+# the dispatch loop can handle every binary instruction with one lookup.
+BINARY_DISPATCH = [None] * len(OpCode)
+BINARY_DISPATCH[OpCode.ADD] = BINARY_OPERATIONS[TokenType.PLUS]
+BINARY_DISPATCH[OpCode.SUBTRACT] = BINARY_OPERATIONS[TokenType.MINUS]
+BINARY_DISPATCH[OpCode.MULTIPLY] = BINARY_OPERATIONS[TokenType.STAR]
+BINARY_DISPATCH[OpCode.DIVIDE] = BINARY_OPERATIONS[TokenType.SLASH]
+BINARY_DISPATCH[OpCode.POWER] = BINARY_OPERATIONS[TokenType.STAR_STAR]
+BINARY_DISPATCH[OpCode.FLOOR_DIVIDE] = BINARY_OPERATIONS[TokenType.SLASH_SLASH]
+BINARY_DISPATCH[OpCode.GREATER] = BINARY_OPERATIONS[TokenType.GT]
+BINARY_DISPATCH[OpCode.LESS] = BINARY_OPERATIONS[TokenType.LT]
+BINARY_DISPATCH[OpCode.GREATER_EQUAL] = BINARY_OPERATIONS[TokenType.GT_EQUAL]
+BINARY_DISPATCH[OpCode.LESS_EQUAL] = BINARY_OPERATIONS[TokenType.LT_EQUAL]
+BINARY_DISPATCH[OpCode.EQUAL] = BINARY_OPERATIONS[TokenType.EQUAL_EQUAL]
+BINARY_DISPATCH[OpCode.NOT_EQUAL] = BINARY_OPERATIONS[TokenType.BANG_EQUAL]
+BINARY_DISPATCH[OpCode.IS] = BINARY_OPERATIONS[TokenType.IS]
+
+UNARY_DISPATCH = [None] * len(OpCode)
+UNARY_DISPATCH[OpCode.NEGATE] = UNARY_OPERATIONS[TokenType.MINUS]
+UNARY_DISPATCH[OpCode.NOT] = UNARY_OPERATIONS[TokenType.NOT]
+
+# Instruction kinds of the decoded form, each paired with its operand: the
+# value to push, the operation to apply or the variable name to read.
+BINARY = 0
+PUSH = 1
+VARIABLE = 2
+UNARY = 3
+RETURN = 4
+UNSUPPORTED = 5
+
+
+class VM:
+    @staticmethod
+    def run(chunk: Chunk, env: dict[str, Any] | None = None) -> Any:
+        if chunk.instructions is None:
+            chunk.instructions = decode(chunk)
+        return _VM(chunk.instructions, env if env is not None else {}).run()
+
+
+def decode(chunk: Chunk) -> list[tuple[int, Any]]:
+    """
+    Translates the bytecode of `chunk` once into `(kind, operand)` pairs with
+    constants, names and operations already looked up, so running it takes a
+    single branch per instruction instead of one per opcode tested.
+    """
+    code = chunk.code
+    constants = chunk.constants
+    instructions: list[tuple[int, Any]] = []
+    ip = 0
+    while ip < len(code):
+        opcode = code[ip]
+        ip += 1
+        if BINARY_DISPATCH[opcode]:
+            instructions.append((BINARY, BINARY_DISPATCH[opcode]))
+        elif UNARY_DISPATCH[opcode]:
+            instructions.append((UNARY, UNARY_DISPATCH[opcode]))
+        else:
+            match opcode:
+                case OpCode.CONSTANT:
+                    instructions.append((PUSH, constants[code[ip]]))
+                    ip += 1
+                case OpCode.CONSTANT_LONG:
+                    instructions.append((PUSH, constants[code[ip] << 16 | code[ip + 1] << 8 | code[ip + 2]]))
+                    ip += 3
+                case OpCode.GET_VARIABLE:
+                    instructions.append((VARIABLE, constants[code[ip]]))
+                    ip += 1
+                case OpCode.GET_VARIABLE_LONG:
+                    instructions.append((VARIABLE, constants[code[ip] << 16 | code[ip + 1] << 8 | code[ip + 2]]))
+                    ip += 3
+                case OpCode.TRUE:
+                    instructions.append((PUSH, True))
+                case OpCode.FALSE:
+                    instructions.append((PUSH, False))
+                case OpCode.NIL:
+                    instructions.append((PUSH, None))
+                case OpCode.RETURN:
+                    instructions.append((RETURN, None))
+                case _:
+                    instructions.append((UNSUPPORTED, None))
+    return instructions
+
+
+class _VM:
+    def __init__(self, instructions: list[tuple[int, Any]], env: dict[str, Any]) -> None:
+        self.instructions = instructions
+        self.env = env
+        self.stack: list[Any] = []
+
+
+    def run(self):
+        env = self.env
+        stack = self.stack
+        push = stack.append
+        pop = stack.pop
+        # Ordered by how often each kind occurs in arithmetic code.
+        for kind, operand in self.instructions:
+            if kind == BINARY:
+                right = pop()
+                stack[-1] = operand(stack[-1], right)
+            elif kind == PUSH:
+                push(operand)
+            elif kind == VARIABLE:
+                push(lookup(env, operand))
+            elif kind == UNARY:
+                stack[-1] = operand(stack[-1])
+            elif kind == RETURN:
+                return pop()
+            else:
+                raise LoxRuntimeError("[RUNTIME ERROR] Expression is not supported.")
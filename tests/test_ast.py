@@ -0,0 +1,31 @@
+import io
+import json
+import os
+import pytest
+from src.ast import AstParser
+from src.interpreter import Interpreter
+
+
+# Trees printed by the original recursive printer, one case per operator
+# followed by random expressions.
+GOLDEN_PATH = os.path.join(os.path.dirname(__file__), "data", "ast_golden.json")
+
+
+def golden_cases() -> list[tuple[str, str]]:
+    with open(GOLDEN_PATH, encoding="utf-8") as f:
+        return [(source, printed) for source, printed in json.load(f)]
+
+
+@pytest.mark.parametrize("parser", ["pratt", "recursive"])
+def test_matches_golden_output(parser):
+    for source, printed in golden_cases():
+        stream = io.StringIO()
+        AstParser.print(Interpreter.parse(source + "\n", parser=parser), stream)
+        assert stream.getvalue() == printed, source
+
+
+def test_prints_deep_trees():
+    depth = 3000
+    stream = io.StringIO()
+    AstParser.print(Interpreter.parse("(" * depth + "1" + ")" * depth + "\n"), stream)
+    assert stream.getvalue().count("\n") == depth + 1
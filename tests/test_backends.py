@@ -0,0 +1,60 @@
+import random
+import pytest
+from bench.workload import generate
+from src.interpreter import Interpreter
+
+
+BACKENDS = ["closure", "vm", "flat"]
+ATOMS = ["1", "2", "0", "3.5", "0.5", "'a'", '"b"', "true", "false", "nil", "x", "y", "missing"]
+OPERATORS = ["+", "-", "*", "/", "**", "//", ">", "<", ">=", "<=", "==", "is"]
+ENV = { "x": 3, "y": "s" }
+
+
+def expression(rng: random.Random, depth: int) -> str:
+    roll = rng.random()
+    if depth == 0 or roll < 0.3:
+        return rng.choice(ATOMS)
+    if roll < 0.45:
+        return rng.choice(["-", "not "]) + expression(rng, depth - 1)
+    if roll < 0.6:
+        return "(" + expression(rng, depth - 1) + ")"
+    return expression(rng, depth - 1) + " " + rng.choice(OPERATORS) + " " + expression(rng, depth - 1)
+
+
+def corpus(seed: int, size: int = 500) -> list[str]:
+    rng = random.Random(seed)
+    return [expression(rng, 5) + "\n" for _ in range(size)]
+
+
+def outcome(source: str, backend: str, optimize: bool = False):
+    try:
+        value = Interpreter.run_script(source, backend=backend, optimize=optimize, env=dict(ENV))
+    except Exception as error:
+        return "error", str(error)
+    return type(value), value
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("seed", range(3))
+def test_backend_matches_tree(backend, seed):
+    for source in corpus(seed):
+        assert outcome(source, backend) == outcome(source, "tree"), source
+
+
+@pytest.mark.parametrize("backend", ["tree"] + BACKENDS)
+def test_optimized_matches_tree(backend):
+    for source in corpus(7):
+        assert outcome(source, backend, optimize=True) == outcome(source, "tree"), source
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("mix", ["arithmetic", "comparison", "mixed"])
+def test_backend_matches_tree_on_workload(backend, mix):
+    source = generate(2000, 4, mix, seed=1)
+    assert outcome(source, backend) == outcome(source, "tree")
+
+
+@pytest.mark.parametrize("backend", ["vm", "flat"])
+def test_long_chain(backend):
+    source = " + ".join(["1"] * 5000) + "\n"
+    assert outcome(source, backend) == (int, 5000)
@@ -0,0 +1,70 @@
+import io
+import json
+import subprocess
+import sys
+from pathlib import Path
+import pytest
+from src.batch import BatchRunner, run_batch_script
+
+
+ROOT = Path(__file__).resolve().parent.parent
+SCRIPTS = {
+    "pass.lox": "1 + 2 * 3\n",
+    "syntax.lox": "1 +\n",
+    "runtime.lox": "1 / 0\n",
+}
+
+
+def write_scripts(directory: Path, scripts: dict[str, str]) -> None:
+    for name, source in scripts.items():
+        (directory / name).write_text(source, encoding="utf-8")
+
+
+def run_main(*args: str) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, str(ROOT / "main"), *args], capture_output=True, text=True, cwd=ROOT)
+
+
+def test_mixed_results(tmp_path):
+    write_scripts(tmp_path, SCRIPTS)
+    report = io.StringIO()
+    assert not BatchRunner(str(tmp_path), workers=1).run(report)
+    results = { Path(result["file"]).name: result for result in map(json.loads, report.getvalue().splitlines()) }
+    assert results["pass.lox"]["status"] == "ok"
+    assert results["pass.lox"]["result"] == "7"
+    assert {"scan", "parse", "evaluate", "total"} <= set(results["pass.lox"]["timings"])
+    assert results["syntax.lox"]["status"] == "error"
+    assert results["syntax.lox"]["error"].startswith("LoxSyntaxError")
+    assert results["runtime.lox"]["status"] == "error"
+    assert results["runtime.lox"]["error"].startswith("LoxRuntimeError")
+
+
+@pytest.mark.parametrize("parser", ["pratt", "recursive"])
+@pytest.mark.parametrize("backend", ["tree", "flat"])
+def test_matches_single_run(tmp_path, parser, backend):
+    for name, source in SCRIPTS.items():
+        path = tmp_path / name
+        path.write_text(source, encoding="utf-8")
+        result = run_batch_script(str(path), backend, parser, optimize=True, intern=True)
+        single = run_main(str(path), "--backend", backend, "--parser", parser, "--optimize", "--intern")
+        if single.returncode == 0:
+            assert result["status"] == "ok"
+            assert result["result"] == single.stdout.strip()
+        else:
+            assert result["status"] == "error"
+
+
+def test_deep_nesting(tmp_path):
+    path = tmp_path / "deep.lox"
+    path.write_text("(" * 5000 + "1" + ")" * 5000 + "\n", encoding="utf-8")
+    assert run_batch_script(str(path), "flat")["result"] == "1"
+    tree = run_batch_script(str(path), "tree")
+    assert tree["error"] == "LoxRuntimeError: [RUNTIME ERROR] Expression is nested too deeply."
+    recursive = run_batch_script(str(path), "flat", "recursive")
+    assert recursive["error"].startswith("LoxSyntaxError")
+
+
+def test_exit_code(tmp_path):
+    write_scripts(tmp_path, { "pass.lox": SCRIPTS["pass.lox"] })
+    assert run_main("--batch", str(tmp_path), "--workers", "1").returncode == 0
+    write_scripts(tmp_path, SCRIPTS)
+    assert run_main("--batch", str(tmp_path), "--workers", "1").returncode == 1
@@ -0,0 +1,45 @@
+import os
+from src.cache import CACHE_DIR, ScriptCache
+from src.grammar import GroupExpr
+from src.interpreter import Interpreter
+
+
+def test_store_and_load(tmp_path):
+    script = tmp_path / "script.lox"
+    script.write_text("1 + 2\n")
+    expr = Interpreter.parse_file(str(script))
+    ScriptCache(str(script)).store(expr)
+    assert Interpreter.run_expr(ScriptCache(str(script)).load()) == 3
+
+
+def test_changed_source_is_not_loaded(tmp_path):
+    script = tmp_path / "script.lox"
+    script.write_text("1 + 2\n")
+    ScriptCache(str(script)).store(Interpreter.parse_file(str(script)))
+    script.write_text("1 + 3\n")
+    assert ScriptCache(str(script)).load() is None
+
+
+def test_failed_store_leaves_no_temporary_file(tmp_path):
+    script = tmp_path / "script.lox"
+    script.write_text("1\n")
+    expr = Interpreter.parse_file(str(script))
+    # Deeper than the pickler can recurse.
+    for _ in range(50_000):
+        expr = GroupExpr(expr)
+    cache = ScriptCache(str(script))
+    cache.store(expr)
+    assert os.listdir(tmp_path / CACHE_DIR) == []
+    assert cache.load() is None
+
+
+def test_load_without_touching_entry(tmp_path, monkeypatch):
+    script = tmp_path / "script.lox"
+    script.write_text("1 + 2\n")
+    ScriptCache(str(script)).store(Interpreter.parse_file(str(script)))
+
+    def read_only(*args, **kwargs):
+        raise PermissionError("read-only file system")
+
+    monkeypatch.setattr(os, "utime", read_only)
+    assert Interpreter.run_expr(ScriptCache(str(script)).load()) == 3
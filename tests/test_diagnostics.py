@@ -0,0 +1,38 @@
+import pickle
+import pytest
+from src.diagnostics import LoxSyntaxError
+from src.interpreter import Interpreter
+
+
+def diagnostics(source: str, parser: str) -> list[tuple[str, int, tuple[int, int]]]:
+    with pytest.raises(LoxSyntaxError) as error:
+        Interpreter.parse(source, parser=parser)
+    return [(diagnostic.kind, diagnostic.row[0], diagnostic.col) for diagnostic in error.value.diagnostics]
+
+
+@pytest.mark.parametrize("parser", ["recursive", "pratt"])
+def test_every_error_in_one_pass(parser):
+    assert diagnostics("1 + $ + 2\n3 + 'open\n", parser) == [
+        ("UNKNOWN SYMBOL", 1, (4, 4)),
+        ("SYNTAX ERROR", 1, (6, 6)),
+        ("SYNTAX ERROR", 2, (1, 1)),
+        ("UNTERMINATED STRING", 2, (5, 5)),
+    ]
+    assert diagnostics("(1 + \n2 * * 3\n1.2.3 + 4\n", parser) == [
+        ("SYNTAX ERROR", 2, (5, 5)),
+        ("INVALID NUMBER", 3, (1, 5)),
+        ("SYNTAX ERROR", 3, (1, 5)),
+    ]
+
+
+@pytest.mark.parametrize("parser", ["recursive", "pratt"])
+def test_errors_on_many_lines(parser):
+    source = "".join("1 + $\n" if line % 100 == 0 else "1 + 2\n" for line in range(10_000))
+    found = diagnostics(source, parser)
+    assert [row for kind, row, _ in found if kind == "UNKNOWN SYMBOL"] == list(range(1, 10_000, 100))
+
+
+def test_error_survives_pickling():
+    with pytest.raises(LoxSyntaxError) as error:
+        Interpreter.parse("1 +\n")
+    assert str(pickle.loads(pickle.dumps(error.value))) == str(error.value)
@@ -0,0 +1,125 @@
+import asyncio
+import time
+import pytest
+from src.diagnostics import LoxSyntaxError
+from src.engine import MAX_INT_BITS, BudgetExceeded, Engine, evaluate_flat, parse_source
+from src.evaluator import LoxRuntimeError
+from src.flat_ast import FlatEvaluator
+from tests.test_backends import ENV, corpus
+
+
+# Each `x // y` takes milliseconds, so the sum runs for seconds unless the
+# worker stops.
+SLOW_ENV = { "x": (1 << (MAX_INT_BITS - 1)) - 1, "y": (1 << (MAX_INT_BITS // 2)) - 7 }
+SLOW_SOURCE = " + ".join(["x // y"] * 500)
+
+
+def run(engine_args: dict, requests) -> list:
+    async def main():
+        async with Engine(**engine_args) as engine:
+            return await requests(engine)
+    return asyncio.run(main())
+
+
+async def outcome(request) -> tuple[str, object, float]:
+    start = time.perf_counter()
+    try:
+        value = await request
+    except Exception as error:
+        return type(error).__name__, str(error), time.perf_counter() - start
+    return "value", value, time.perf_counter() - start
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_evaluate(executor):
+    async def requests(engine):
+        return [
+            await engine.evaluate("price * quantity >= 100", { "price": 9.5, "quantity": 12 }),
+            await engine.evaluate("'a' + 'b'"),
+            await engine.evaluate("'a' + 'b'"),
+        ]
+    assert run({ "executor": executor }, requests) == [True, "ab", "ab"]
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_errors(executor):
+    async def requests(engine):
+        with pytest.raises(LoxSyntaxError):
+            await engine.evaluate("1 +")
+        with pytest.raises(LoxRuntimeError):
+            await engine.evaluate("1 / 0")
+        with pytest.raises(BudgetExceeded):
+            await engine.evaluate(" + ".join(["1"] * 20), max_steps=10)
+    run({ "executor": executor }, requests)
+
+
+def test_long_source_is_refused_before_parsing():
+    async def requests(engine):
+        # Not valid Lox either: the token count alone refuses it.
+        refused = await outcome(engine.evaluate("+ " * 21, max_steps=10))
+        nested = await outcome(engine.evaluate("((((1))))", max_steps=5))
+        return refused, nested, len(engine.cache)
+    refused, nested, cached = run({}, requests)
+    assert refused[:2] == ("BudgetExceeded", "[RUNTIME ERROR] Step budget exceeded.")
+    assert nested[:2] == ("value", 1)
+    assert cached == 1
+
+
+def test_matches_flat_evaluator():
+    def result(evaluate):
+        try:
+            value = evaluate()
+        except LoxRuntimeError as error:
+            return "error", str(error)
+        return type(value), value
+    for source in corpus(11):
+        flat = parse_source(source)
+        expected = result(lambda: FlatEvaluator.evaluate(flat, dict(ENV)))
+        assert result(lambda: evaluate_flat(flat, dict(ENV), None, None)) == expected, source
+
+
+@pytest.mark.parametrize("source", [
+    " * ".join(["(3 ** 500000)"] * 41),
+    "2 ** 100000 * 2 ** 100000 * 2 ** 100000",
+    "(2 ** 200000 - 1) + (2 ** 200000 - 1) + (2 ** 200000 - 1) + (2 ** 200000 - 1)",
+    "x * 2",
+])
+def test_oversized_integers_are_refused(source):
+    async def requests(engine):
+        return await outcome(engine.evaluate(source, { "x": 1 << MAX_INT_BITS }))
+    kind, message, _ = run({ "timeout": None }, requests)
+    assert (kind, message) == ("BudgetExceeded", "[RUNTIME ERROR] Integer result is too large.")
+
+
+def test_oversized_strings_are_refused():
+    source = "s" + " + s" * 20
+    async def requests(engine):
+        return await outcome(engine.evaluate(source, { "s": "x" * (1 << 20) }))
+    kind, message, _ = run({ "timeout": None }, requests)
+    assert (kind, message) == ("BudgetExceeded", "[RUNTIME ERROR] String result is too large.")
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_timeout_stops_worker(executor):
+    async def requests(engine):
+        await engine.evaluate("1")
+        slow = await outcome(engine.evaluate(SLOW_SOURCE, SLOW_ENV, timeout=0.3))
+        # The only worker is free again once the slow request stops.
+        quick = await outcome(engine.evaluate("1 + 2"))
+        return slow, quick
+    slow, quick = run({ "executor": executor, "workers": 1, "timeout": 5, "max_steps": None }, requests)
+    assert slow[:2] == ("BudgetExceeded", "[RUNTIME ERROR] Time budget exceeded.")
+    assert slow[2] < 1
+    assert quick[:2] == ("value", 3)
+    assert quick[2] < 1
+
+
+def test_cancel_stops_thread_worker():
+    async def requests(engine):
+        slow = asyncio.ensure_future(engine.evaluate(SLOW_SOURCE, SLOW_ENV))
+        await asyncio.sleep(0.2)
+        slow.cancel()
+        return await outcome(engine.evaluate("1 + 2"))
+    quick = run({ "workers": 1, "timeout": None, "max_steps": None }, requests)
+    assert quick[:2] == ("value", 3)
+    assert quick[2] < 1
@@ -0,0 +1,33 @@
+import io
+import pytest
+from bench.workload import generate
+from src.ast import AstParser
+from src.flat_ast import FlatAst, FlatEvaluator
+from src.interpreter import Interpreter
+from tests.test_backends import ENV, corpus
+
+
+def render(expr) -> str:
+    tree = io.StringIO()
+    AstParser.print(expr, tree)
+    return tree.getvalue()
+
+
+@pytest.mark.parametrize("seed", range(2))
+def test_view_prints_like_tree(seed):
+    for source in corpus(seed, 200):
+        expr = Interpreter.parse(source)
+        assert render(FlatAst.from_tree(expr).node()) == render(expr), source
+
+
+def test_workload_round_trip():
+    expr = Interpreter.parse(generate(2000, 4, "mixed", seed=2))
+    flat = FlatAst.from_tree(expr)
+    assert render(flat.node()) == render(expr)
+    assert FlatEvaluator.evaluate(flat, dict(ENV)) == Interpreter.run_expr(expr)
+
+
+def test_literals_and_names_are_pooled():
+    flat = FlatAst.from_tree(Interpreter.parse("x + 1 + x + 1 + 'a' + 'a'\n"))
+    assert len(flat.names) == 1
+    assert len(flat.literals) == 2
@@ -0,0 +1,82 @@
+import io
+import random
+import pytest
+from src.ast import AstParser
+from src.incremental import IncrementalDocument
+from src.parser import Parser
+from src.scanner import Scanner
+
+
+PIECES = [
+    "1", "23", "4.5", " ", "\n", "+", "-", "*", "==", "(", ")", "(", ")", "not",
+    "foo", "'ab'", '"c\nd"', "# hi\n",
+]
+ERROR_PIECES = ["$", "'open", "1.2.3", "+ +"]
+
+
+def signature(tokens) -> list[tuple]:
+    return [(token.type, token.lexeme, token.row, token.col) for token in tokens]
+
+
+def render(expr) -> str:
+    tree = io.StringIO()
+    AstParser.print(expr, tree)
+    return tree.getvalue()
+
+
+def full_parse(source: str) -> tuple[list[tuple], str, list[str]]:
+    diagnostics = []
+    tokens = Scanner(source, "fast", diagnostics).scan()
+    expr = Parser(tokens, "pratt", diagnostics=diagnostics).parse()
+    return signature(tokens), render(expr), sorted(map(str, diagnostics))
+
+
+def document_state(document: IncrementalDocument) -> tuple[list[tuple], str, list[str]]:
+    return signature(document.tokens), render(document.tree), sorted(map(str, document.diagnostics))
+
+
+def random_edits(seed: int, pieces: list[str], documents: int = 100, edits: int = 30):
+    rng = random.Random(seed)
+    for _ in range(documents):
+        document = IncrementalDocument("".join(rng.choice(pieces) + " " for _ in range(rng.randint(1, 30))))
+        for _ in range(edits):
+            offset = rng.randint(0, len(document.source))
+            deleted = rng.randint(0, min(3, len(document.source) - offset))
+            inserted = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 2)))
+            yield document, offset, deleted, inserted
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_edits_match_full_parse(seed):
+    partial = 0
+    for document, offset, deleted, inserted in random_edits(seed, PIECES):
+        document.edit(offset, deleted, inserted)
+        assert document_state(document) == full_parse(document.source), (document.source, offset, deleted, inserted)
+        partial += document.reparsed_tokens < len(document.tokens)
+    # Some edits must have taken the incremental path.
+    assert partial > 0
+
+
+@pytest.mark.parametrize("seed", range(2))
+def test_edits_with_errors_match_full_parse(seed, capsys):
+    for document, offset, deleted, inserted in random_edits(seed, PIECES + ERROR_PIECES):
+        document.edit(offset, deleted, inserted)
+        assert document_state(document) == full_parse(document.source), (document.source, offset, deleted, inserted)
+    # Errors are reported as diagnostics, never printed.
+    assert capsys.readouterr().out == ""
+
+
+def test_edit_inside_group_reparses_only_the_group():
+    document = IncrementalDocument("1 + (2 * 3) + 4\n")
+    document.edit(5, 1, "20")
+    assert document.reparsed_tokens == 5
+    assert document_state(document) == full_parse(document.source)
+
+
+def test_deep_nesting():
+    depth = 5000
+    document = IncrementalDocument("(" * depth + "1" + ")" * depth + "\n")
+    assert document.diagnostics == []
+    document.edit(depth, 1, "2 + 3")
+    assert document.reparsed_tokens == 5
+    assert document_state(document) == full_parse(document.source)
@@ -0,0 +1,73 @@
+import pytest
+from src.evaluator import Evaluator, MemoizingEvaluator
+from src.interning import NodeInterner
+from src.interpreter import Interpreter
+from src.parser import Parser
+from src.scanner import Scanner
+from tests.test_backends import ENV, corpus, outcome
+
+
+def test_shared_subtrees_are_one_object():
+    expr = Interpreter.parse("(x + 1) * 2 + (x + 1) * 2\n", intern=True)
+    assert expr.left is expr.right
+    assert expr.left.left.group.left is expr.right.left.group.left
+
+
+def test_distinct_subtrees_stay_apart():
+    expr = Interpreter.parse("(1 + 1) + (1 + 1.0) + (1 + true)\n", intern=True)
+    assert expr.left.left is not expr.left.right
+    assert expr.left.left.group.right is not expr.left.right.group.right
+
+
+def test_interner_shared_across_parses():
+    nodes = NodeInterner()
+    first = Parser(Scanner("a * b + 1\n").scan(), nodes=nodes).parse()
+    second = Parser(Scanner("a * b - 1\n").scan(), nodes=nodes).parse()
+    assert first.left is second.left
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_memoized_matches_plain(seed):
+    for source in corpus(seed):
+        plain = outcome(source, "tree")
+        try:
+            value = Interpreter.run_script(source, intern=True, env=dict(ENV))
+            memoized = (type(value), value)
+        except Exception as error:
+            memoized = ("error", str(error))
+        assert memoized == plain, source
+
+
+def test_memo_does_not_outlive_environment():
+    expr = Interpreter.parse("(x * 2) + (x * 2)\n", intern=True)
+    env = { "x": 1 }
+    evaluator = MemoizingEvaluator(env)
+    assert evaluator.evaluate(expr) == 4
+    env["x"] = 5
+    assert evaluator.evaluate(expr) == 20
+    env["x"] = "s"
+    with pytest.raises(Exception, match="Operands must be numbers"):
+        evaluator.evaluate(expr)
+    env["x"] = 2
+    assert evaluator.evaluate(expr) == 8
+
+
+def test_compiled_intern_reads_env_each_call():
+    env = { "x": 1 }
+    compiled = Interpreter.compile(Interpreter.parse("x + x * x\n", intern=True), intern=True, env=env)
+    assert compiled() == 2
+    env["x"] = 3
+    assert compiled() == 12
+
+
+def test_memo_evaluates_each_shared_node_once():
+    calls = []
+
+    class Counting(MemoizingEvaluator):
+        def visit_variable(self, expr):
+            calls.append(expr.name)
+            return super().visit_variable(expr)
+
+    expr = Interpreter.parse(" + ".join(["(x * 2 - 1)"] * 8) + "\n", intern=True)
+    assert Counting({ "x": 1 }).evaluate(expr) == Evaluator({ "x": 1 }).evaluate(expr)
+    assert calls == ["x"]
@@ -0,0 +1,51 @@
+import io
+import random
+import pytest
+from src.ast import AstParser
+from src.interpreter import Interpreter
+from src.optimizer import Optimizer
+from src.profiler import count_nodes
+from tests.test_backends import expression
+
+
+def render(expr) -> str:
+    tree = io.StringIO()
+    AstParser.print(expr, tree)
+    return tree.getvalue()
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_removed_count_and_input_untouched(seed):
+    rng = random.Random(seed)
+    for _ in range(300):
+        source = expression(rng, 5) + "\n"
+        expr = Interpreter.parse(source)
+        before = render(expr)
+        optimized, removed = Optimizer.optimize(expr)
+        assert render(expr) == before, source
+        assert removed == count_nodes(expr) - count_nodes(optimized), source
+        assert removed >= 0
+
+
+@pytest.mark.parametrize("source, expected, removed", [
+    ("1 + 2 * 3", 7, 4),
+    ("(1 + 2)", 3, 3),
+    ("not not (x < 1)", None, 3),
+    ("- - x", None, 0),
+    ("1 / 0", None, 0),
+])
+def test_folding(source, expected, removed):
+    optimized, count = Optimizer.optimize(Interpreter.parse(source + "\n"))
+    assert count == removed
+    if expected is not None:
+        assert optimized.value == expected
+
+
+def test_folding_keeps_errors():
+    for source in ["1 / 0", "'a' - 1", "-'a'", "x + (1 // 0)", "2.0 ** 10000"]:
+        expr = Interpreter.parse(source + "\n")
+        with pytest.raises(Exception) as plain:
+            Interpreter.run_expr(expr, env={ "x": 1 })
+        with pytest.raises(Exception) as optimized:
+            Interpreter.run_expr(expr, optimize=True, env={ "x": 1 })
+        assert str(optimized.value) == str(plain.value)
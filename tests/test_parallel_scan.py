@@ -0,0 +1,41 @@
+import mmap
+import pytest
+from bench.workload import generate
+from src import scanner
+from src.scanner import Scanner
+
+
+def signature(buffer) -> list[tuple]:
+    return [(token.type, token.lexeme, token.row, token.col) for token in buffer]
+
+
+def scan(source, workers: int | None = None, path: str | None = None) -> tuple[list[tuple], list[str]]:
+    diagnostics = []
+    scanner = Scanner(source, diagnostics=diagnostics)
+    if workers is None:
+        tokens = scanner.scan_buffer()
+    else:
+        tokens = scanner.scan_parallel(workers, min_chunk_size=256, path=path)
+    return signature(tokens), [str(diagnostic) for diagnostic in diagnostics]
+
+
+SOURCE = (
+    generate(400, 3, "mixed", seed=3)
+    + "\n+ 'multi\nline' + $ + 1.2.3\n# comment 'x\n+ \"open\n"
+    + generate(400, 3, "mixed", seed=4)
+)
+
+
+@pytest.mark.parametrize("workers", [2, 4])
+def test_parallel_matches_serial(workers):
+    assert scan(SOURCE, workers) == scan(SOURCE)
+
+
+@pytest.mark.parametrize("workers", [2, 4])
+def test_parallel_mapped_file_matches_serial(tmp_path, monkeypatch, workers):
+    monkeypatch.setattr(scanner, "NEWLINE_WINDOW", 7)
+    path = tmp_path / "big.lox"
+    path.write_bytes(SOURCE.encode())
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as source:
+        assert scan(source, workers, str(path)) == scan(source)
+        assert scan(source, workers, str(path)) == scan(source, workers)
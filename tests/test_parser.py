@@ -0,0 +1,50 @@
+import io
+import random
+import pytest
+from src.ast import AstParser
+from src.parser import Parser
+from src.scanner import Scanner
+
+
+PIECES = [
+    "1", "2.5", "'s'", "true", "nil", "x", "+", "-", "*", "**", "//", "/",
+    "==", "!=", "is", "<", ">=", "not", "(", ")", "(", ")", ";",
+]
+
+
+def corpus(seed: int, size: int = 500) -> list[str]:
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(PIECES) for _ in range(rng.randint(0, 25))) + "\n" for _ in range(size)]
+
+
+def tokens(source: str, cursor: str):
+    match cursor:
+        case "list":
+            return Scanner(source).scan()
+        case "buffer":
+            return Scanner(source).scan_buffer()
+        case "stream":
+            return Scanner(io.StringIO(source)).iter_tokens()
+
+
+def parse(source: str, engine: str, cursor: str) -> tuple[str, list[str]]:
+    diagnostics = []
+    expr = Parser(tokens(source, cursor), engine, diagnostics=diagnostics).parse()
+    tree = io.StringIO()
+    AstParser.print(expr, tree)
+    return tree.getvalue(), [str(diagnostic) for diagnostic in diagnostics]
+
+
+@pytest.mark.parametrize("cursor", ["list", "buffer", "stream"])
+@pytest.mark.parametrize("seed", range(3))
+def test_pratt_matches_recursive(cursor, seed):
+    for source in corpus(seed):
+        assert parse(source, "pratt", cursor) == parse(source, "recursive", "list"), source
+
+
+def test_pratt_parses_deep_nesting():
+    depth = 100_000
+    source = "not " * depth + "(" * depth + "1" + ")" * depth + "\n"
+    diagnostics = []
+    Parser(Scanner(source).scan_buffer(), "pratt", diagnostics=diagnostics).parse()
+    assert diagnostics == []
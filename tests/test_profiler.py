@@ -0,0 +1,59 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+from src.interpreter import Interpreter
+from src.profiler import PhaseProfiler
+
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_records_phases():
+    profiler = PhaseProfiler(count_nodes=True)
+    assert Interpreter.run_script("1 + x * (2 - 3)\n", profiler=profiler, env={ "x": 2 }) == -1
+    report = profiler.report()
+    phases = { record["phase"]: record for record in report["phases"] }
+    assert list(phases) == ["scan", "parse", "compile", "evaluate"]
+    for record in phases.values():
+        assert record["seconds"] >= 0
+        assert record["allocated_blocks"] > 0
+        assert record["allocated_bytes"] != 0 or record["peak_bytes"] > 0
+    assert phases["scan"]["items"] == 9
+    assert phases["scan"]["unit"] == "tokens"
+    assert phases["parse"]["items"] == phases["evaluate"]["items"] == 8
+    assert report["total_seconds"] == sum(record["seconds"] for record in report["phases"])
+    assert report["node_counts"] == { "BinaryExpr": 3, "LiteralExpr": 3, "VariableExpr": 1, "GroupExpr": 1 }
+
+
+def test_without_allocations_or_node_counts():
+    profiler = PhaseProfiler(trace_allocations=False)
+    Interpreter.run_script("1 + 2\n", optimize=True, profiler=profiler)
+    report = profiler.report()
+    assert [record["phase"] for record in report["phases"]] == ["scan", "parse", "optimize", "compile", "evaluate"]
+    assert all(record["allocated_blocks"] == 0 for record in report["phases"])
+    assert "node_counts" not in report
+
+
+def test_deep_tree_does_not_fail_run():
+    # Node counting walks the tree recursively and gives up part way, but
+    # the flat backend still evaluates the whole expression.
+    profiler = PhaseProfiler(count_nodes=True)
+    source = "(" * 5000 + "1" + ")" * 5000 + "\n"
+    assert Interpreter.run_script(source, backend="flat", profiler=profiler) == 1
+    report = profiler.report()
+    assert report["phases"][-1]["phase"] == "evaluate"
+    assert report["phases"][-1]["items"] == 5001
+    assert 0 < report["node_counts"]["GroupExpr"] < 5000
+
+
+def test_profile_flag(tmp_path):
+    path = tmp_path / "script.lox"
+    path.write_text("2 * 3\n", encoding="utf-8")
+    args = [sys.executable, str(ROOT / "main"), str(path), "--profile", "--profile-nodes"]
+    process = subprocess.run(args, capture_output=True, text=True, cwd=ROOT)
+    assert process.returncode == 0
+    assert process.stdout.strip() == "6"
+    report = json.loads(process.stderr)
+    assert "evaluate" in [record["phase"] for record in report["phases"]]
+    assert report["node_counts"] == { "BinaryExpr": 1, "LiteralExpr": 2 }
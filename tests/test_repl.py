@@ -0,0 +1,38 @@
+import pytest
+from src.diagnostics import LoxSyntaxError
+from src.evaluator import LoxRuntimeError
+from src.repl import Repl
+
+
+@pytest.mark.parametrize("backend", ["tree", "closure", "vm", "flat"])
+def test_line_matches_script(backend):
+    repl = Repl(backend)
+    assert repl.run_line("1 + 2 * 3") == 7
+    assert repl.run_line("'a' + 'b'") == "ab"
+
+
+def test_lines_are_cached(capsys):
+    repl = Repl()
+    repl.show_timings = True
+    repl.run_line("1 + 2")
+    repl.run_line("1 + 2")
+    first, second = capsys.readouterr().out.splitlines()
+    assert first.startswith("scan ")
+    assert second.startswith("cached ")
+
+
+def test_state_is_shared_between_lines():
+    repl = Repl()
+    repl.run_line("1.5 + 2")
+    repl.run_line("2 * 1.50")
+    assert len(repl.constants) == 2
+
+
+def test_errors():
+    repl = Repl()
+    with pytest.raises(LoxSyntaxError):
+        repl.run_line("1 +")
+    with pytest.raises(LoxRuntimeError):
+        repl.run_line("1 / 0")
+    with pytest.raises(LoxRuntimeError):
+        repl.run_line("-" * 100_000 + "1")
@@ -0,0 +1,71 @@
+import io
+import random
+import pytest
+from src.scanner import Scanner
+
+
+PIECES = [
+    "1", "23", "4.5", "0", "0.25", "01", "1.2.3", "7.", " ", "  ", "\n",
+    "+", "+=", "-", "-=", "*", "**", "/", "//", "=", "==", ">", ">=", "<", "<=",
+    "(", ")", ".", ",", ";", "not", "and", "nil", "foo", "x1", "_a", "_1b", "true",
+    "'ab'", '"c\nd"', '"x"', "# hi 'x\n", "!", "$", "é", "'q\n\nr'", "'open", '"open\n',
+]
+
+
+def corpus(seed: int, size: int = 300) -> list[str]:
+    rng = random.Random(seed)
+    sources = []
+    for _ in range(size):
+        pieces = (rng.choice(PIECES) + rng.choice(["", " "]) for _ in range(rng.randint(0, 30)))
+        sources.append("".join(pieces) + "\n")
+    return sources
+
+
+def signature(tokens) -> list[tuple]:
+    return [(token.type, token.lexeme, token.row, token.col) for token in tokens]
+
+
+def scan(source: str, engine: str, chunk_size: int = 64) -> tuple[list[tuple], list[str]]:
+    diagnostics = []
+    match engine:
+        case "default" | "fast":
+            tokens = Scanner(source, engine, diagnostics).scan()
+        case "buffer":
+            tokens = Scanner(source, diagnostics=diagnostics).scan_buffer()
+        case "stream":
+            tokens = Scanner(io.StringIO(source), diagnostics=diagnostics).iter_tokens(chunk_size)
+        case "bytes":
+            tokens = Scanner(source.encode(), diagnostics=diagnostics).scan_buffer()
+    return signature(tokens), [str(diagnostic) for diagnostic in diagnostics]
+
+
+@pytest.mark.parametrize("seed", range(4))
+@pytest.mark.parametrize("engine", ["fast", "buffer", "stream", "bytes"])
+def test_engine_matches_default(engine, seed):
+    for source in corpus(seed):
+        if engine == "bytes" and not source.isascii():
+            continue
+        assert scan(source, engine) == scan(source, "default"), repr(source)
+
+
+def test_bytes_non_ascii_columns_count_bytes():
+    # Byte sources are scanned in place, so columns after a multi-byte
+    # character are byte offsets; everything else matches.
+    for source in corpus(20, 100):
+        expected, _ = scan(source, "default")
+        actual, _ = scan(source, "bytes")
+        assert [token[:3] for token in actual] == [token[:3] for token in expected], repr(source)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 4096])
+def test_stream_chunk_sizes(chunk_size):
+    for source in corpus(10, 100):
+        assert scan(source, "stream", chunk_size) == scan(source, "default"), repr(source)
+
+
+def test_identical_on_examples():
+    source = "1 + 2.5 * (3 - 'a') # comment\n>= nil == true\n\"multi\nline\" // 4 ** 5\n"
+    expected = scan(source, "default")
+    assert expected[1] == []
+    for engine in ("fast", "buffer", "stream", "bytes"):
+        assert scan(source, engine) == expected
@@ -0,0 +1,26 @@
+import pytest
+from src.interpreter import Interpreter
+from src.scanner import Scanner
+from src.symbols import SymbolTable
+from src.token import KEYWORDS, TokenType
+
+
+@pytest.mark.parametrize("engine", ["default", "fast"])
+def test_keywords_and_identifiers(engine):
+    words = list(KEYWORDS) + ["x", "_y1", "nils", "If"]
+    tokens = Scanner(" ".join(words) + "\n", engine).scan()
+    assert [token.type for token in tokens] == [KEYWORDS.get(word, TokenType.IDENT) for word in words]
+
+
+def test_identifiers_share_one_string():
+    symbols = SymbolTable()
+    tokens = Scanner("count + count + count\n", symbols=symbols).scan()
+    names = [token.lexeme for token in tokens if token.type == TokenType.IDENT]
+    assert len(names) == 3
+    assert names[0] is names[1] is names[2]
+    assert len(symbols) == 1
+
+
+def test_tree_names_are_interned():
+    expr = Interpreter.parse("abc + abc\n")
+    assert expr.left.name is expr.right.name
@@ -0,0 +1,59 @@
+import random
+import pytest
+from src.evaluator import Evaluator
+from src.interpreter import Interpreter
+from src.vectorized import VectorEvaluator
+from tests.test_backends import expression
+
+np = pytest.importorskip("numpy")
+
+
+COLUMNS = {
+    "x": np.array([3, 0, -2, 7, 1 << 40]),
+    "y": np.array([0.5, 2.0, -1.5, 0.0, 1e300]),
+    "missing": np.array(["a", "b", "", "d", "e"]),
+}
+
+
+def per_row(expr, columns: dict) -> tuple[str, object]:
+    env: dict = {}
+    evaluator = Evaluator(env)
+    results = []
+    try:
+        for values in zip(*(column.tolist() for column in columns.values())):
+            env.update(zip(columns, values))
+            results.append(evaluator.evaluate(expr))
+    except Exception as error:
+        return "error", str(error)
+    return "values", [(type(value), value) for value in results]
+
+
+def vectorized(expr, columns: dict) -> tuple[str, object]:
+    try:
+        results = VectorEvaluator.evaluate(expr, columns).tolist()
+    except Exception as error:
+        return "error", str(error)
+    return "values", [(type(value), value) for value in results]
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_matches_per_row(seed):
+    rng = random.Random(seed)
+    for _ in range(300):
+        source = expression(rng, 4) + "\n"
+        expr = Interpreter.parse(source)
+        assert vectorized(expr, COLUMNS) == per_row(expr, COLUMNS), source
+
+
+def test_error_of_first_failing_row():
+    # Row 2 fails in the left operand, row 0 in the right one.
+    expr = Interpreter.parse("(y + 1) + 1 / x\n")
+    columns = { "x": np.array([0, 1, 2]), "y": np.array([1, 2, "s"], dtype=object) }
+    assert vectorized(expr, columns) == ("error", "[RUNTIME ERROR] Division by zero.")
+
+
+@pytest.mark.parametrize("body", ["x + 1", "1 / x"])
+def test_deep_nesting(body):
+    expr = Interpreter.parse("(" * 5000 + body + ")" * 5000 + "\n")
+    columns = { "x": np.array([0, 1, 2]) }
+    assert vectorized(expr, columns) == ("error", "[RUNTIME ERROR] Expression is nested too deeply.")